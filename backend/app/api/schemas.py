@@ -13,6 +13,7 @@ class IdeaRequest(BaseModel):
     timeline: Optional[str] = None
     mode: str = "production"  # "mvp" or "production"
     tool: Optional[str] = None  # "lovable", "replit", "base44", "claude_code", or None
+    regenerate: bool = False  # skip cached refinement / domain analysis for a fresh take
 
 
 class IdeaResponse(BaseModel):
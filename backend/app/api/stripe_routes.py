@@ -1,7 +1,6 @@
 import asyncio
 import logging
 
-import stripe
 from fastapi import APIRouter, Depends, HTTPException, Request
 
 from app.core.auth import get_current_user, CurrentUser
@@ -10,8 +9,11 @@ from app.core.supabase_client import get_supabase
 from app.services.stripe_service import (
     create_checkout_session,
     create_portal_session,
+    get_customer_id,
     handle_webhook_event,
     get_tier_from_price,
+    remember_customer,
+    retrieve_subscription,
 )
 
 logger = logging.getLogger(__name__)
@@ -48,18 +50,7 @@ async def checkout(tier: str, user: CurrentUser = Depends(get_current_user)):
 @router.post("/portal")
 async def portal(user: CurrentUser = Depends(get_current_user)):
     """Create a Stripe billing portal session."""
-    def _get_customer():
-        sb = get_supabase()
-        profile = (
-            sb.table("profiles")
-            .select("stripe_customer_id")
-            .eq("id", user.id)
-            .single()
-            .execute()
-        )
-        return profile.data.get("stripe_customer_id") if profile.data else None
-
-    customer_id = await asyncio.to_thread(_get_customer)
+    customer_id = await asyncio.to_thread(get_customer_id, user.id)
     if not customer_id:
         raise HTTPException(status_code=400, detail="No billing account found")
 
@@ -97,7 +88,7 @@ async def stripe_webhook(request: Request):
             user_id = metadata.get("supabase_user_id")
             subscription_id = data.get("subscription")
             if user_id and subscription_id:
-                sub = stripe.Subscription.retrieve(subscription_id)
+                sub = retrieve_subscription(subscription_id)
                 items = sub.get("items", {}).get("data", [])
                 if not items:
                     logger.warning("No items in subscription %s", subscription_id)
@@ -116,7 +107,12 @@ async def stripe_webhook(request: Request):
                     on_conflict="stripe_subscription_id",
                 ).execute()
 
-                sb.table("profiles").update({"tier": tier}).eq("id", user_id).execute()
+                profile_update = {"tier": tier}
+                customer_id = data.get("customer")
+                if customer_id:
+                    profile_update["stripe_customer_id"] = customer_id
+                    remember_customer(user_id, customer_id)
+                sb.table("profiles").update(profile_update).eq("id", user_id).execute()
 
         elif event_type == "customer.subscription.updated":
             sub_id = data.get("id")
@@ -0,0 +1,42 @@
+import threading
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """Thread-safe in-process cache with an optional TTL and oldest-first eviction.
+
+    Services call into it from ``asyncio.to_thread`` / executor workers, so every
+    read and write goes through one lock.
+    """
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: Dict[Hashable, Tuple[Any, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at >= self.ttl:
+                del self._data[key]
+                return default
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            if key not in self._data and len(self._data) >= self.maxsize:
+                # Dicts keep insertion order — drop the oldest entry.
+                self._data.pop(next(iter(self._data)), None)
+            self._data[key] = (value, time.monotonic())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -1,12 +1,12 @@
 from typing import Optional
 
-from openai import OpenAI
-
 
 class OpenAIProvider:
     def __init__(self, api_key: Optional[str], model: str):
         if not api_key:
             raise ValueError("OPENAI_API_KEY is not set.")
+        from openai import OpenAI
+
         self.client = OpenAI(api_key=api_key, timeout=60.0)
         self.model = model
 
@@ -5,6 +5,8 @@ stack selection, prompt generation, documentation, and implementation planning.
 """
 
 import copy
+import dataclasses
+import hashlib
 import json
 import logging
 import re
@@ -12,6 +14,7 @@ from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Optional, Set
 
 from app.api.schemas import IdeaRequest
+from app.core.cache import TTLCache
 from app.providers.openai_provider import OpenAIProvider, get_provider
 from app.services.doc_templates import build_doc_pack
 from app.services.feature_detection import detect_features
@@ -25,6 +28,27 @@ _executor = ThreadPoolExecutor(max_workers=6)
 
 logger = logging.getLogger(__name__)
 
+# Exact-match cache for the low-temperature refinement and domain-analysis
+# calls, so resubmitting the same idea skips those LLM round-trips.
+# IdeaRequest.regenerate skips reads.
+_LLM_CACHE_TTL = 3600
+_LLM_CACHE_MAX = 512
+_llm_cache = TTLCache(maxsize=_LLM_CACHE_MAX, ttl=_LLM_CACHE_TTL)
+
+
+def _cache_key(*parts: Optional[str]) -> str:
+    raw = "\x1f".join(p or "" for p in parts)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cache_get(key: str):
+    value = _llm_cache.get(key)
+    return copy.deepcopy(value) if value is not None else None
+
+
+def _cache_put(key: str, value) -> None:
+    _llm_cache.put(key, copy.deepcopy(value))
+
 
 def _extract_json(text: str) -> dict:
     """Parse JSON from *text*, falling back to regex extraction."""
@@ -124,6 +148,7 @@ def _analyze_domain(
     refined_idea: str,
     target_users: Optional[str],
     mode: str,
+    use_cache: bool = True,
 ) -> Optional[Dict]:
     """Call the LLM to extract a structured domain model from the refined idea."""
     system = _DOMAIN_ANALYSIS_SYSTEM_MVP if mode == "mvp" else _DOMAIN_ANALYSIS_SYSTEM
@@ -131,6 +156,11 @@ def _analyze_domain(
     if target_users:
         user_msg += f"\nTarget users: {target_users}"
 
+    key = _cache_key("domain", mode, refined_idea, target_users)
+    cached = _cache_get(key) if use_cache else None
+    if cached is not None:
+        return cached
+
     max_tok = 1200 if mode == "mvp" else 2500
     try:
         resp = provider.client.chat.completions.create(
@@ -146,13 +176,15 @@ def _analyze_domain(
         text = (resp.choices[0].message.content or "").strip()
         domain = _extract_json(text)
         # Basic validation
-        if "entities" in domain and "api_endpoints" in domain:
-            return domain
-        logger.warning("Domain analysis missing required keys — skipping")
-        return None
+        valid = "entities" in domain and "api_endpoints" in domain
     except Exception:
         logger.warning("Domain analysis failed — prompts will use generic templates")
         return None
+    if not valid:
+        logger.warning("Domain analysis missing required keys — skipping")
+        return None
+    _cache_put(key, domain)
+    return domain
 
 
 def _refine_idea(
@@ -160,6 +192,7 @@ def _refine_idea(
     raw_idea: str,
     target_users: str,
     mode: str,
+    use_cache: bool = True,
 ) -> str:
     """Call the LLM to expand a vague idea into a clear, structured description."""
     system = _REFINE_SYSTEM_MVP if mode == "mvp" else _REFINE_SYSTEM
@@ -167,6 +200,11 @@ def _refine_idea(
     if target_users:
         user_msg += f"\nTarget users: {target_users}"
 
+    key = _cache_key("refine", mode, raw_idea, target_users)
+    cached = _cache_get(key) if use_cache else None
+    if cached is not None:
+        return cached
+
     max_tok = 400 if mode == "mvp" else 800
     try:
         # Use low temperature for factual refinement; disable JSON mode for plain text
@@ -180,10 +218,13 @@ def _refine_idea(
             temperature=0.4,
         )
         text = (refined.choices[0].message.content or "").strip()
-        return text if len(text) > 30 else raw_idea
     except Exception:
         logger.warning("Idea refinement failed — using raw idea")
         return raw_idea
+    if len(text) <= 30:
+        return raw_idea
+    _cache_put(key, text)
+    return text
 
 
 def _estimate_complexity(flags: Set[str]) -> str:
@@ -202,11 +243,12 @@ def generate_package(req: IdeaRequest) -> dict:
         raise ValueError("Idea is too short.")
 
     mode = getattr(req, "mode", "production") or "production"
+    use_cache = not getattr(req, "regenerate", False)
     provider = get_provider()
 
     # 1. Refine the idea via LLM (structured, clear description)
     try:
-        refined = _refine_idea(provider, idea, req.target_users, mode)
+        refined = _refine_idea(provider, idea, req.target_users, mode, use_cache)
     except Exception:
         logger.warning("Idea refinement failed — using raw idea")
         refined = idea
@@ -214,17 +256,15 @@ def generate_package(req: IdeaRequest) -> dict:
     # 2. Analyse the refined idea (features detected from BOTH raw + refined)
     flags = detect_features(idea) | detect_features(refined)
 
-    # 2a. Load tool profile — copy to avoid mutating the module-level singleton
+    # 2a. Load tool profile — profiles are frozen, so fill the stack on a copy
     tool_profile = get_tool_profile(getattr(req, "tool", None))
-    if tool_profile:
-        tool_profile = copy.copy(tool_profile)
 
     if tool_profile and tool_profile.stack is not None:
         stack = tool_profile.stack
     else:
         stack = choose_stack(flags)
-        if tool_profile and tool_profile.stack is None:
-            tool_profile.stack = stack
+        if tool_profile:
+            tool_profile = dataclasses.replace(tool_profile, stack=stack)
 
     # 2b + 4. Run domain analysis and LLM generation in PARALLEL
     # (they both depend on `refined` but not on each other)
@@ -233,7 +273,7 @@ def generate_package(req: IdeaRequest) -> dict:
     usr_prompt = build_user_prompt(req, flags, stack, mode=mode)
 
     domain_future = _executor.submit(
-        _analyze_domain, provider, refined, req.target_users, mode,
+        _analyze_domain, provider, refined, req.target_users, mode, use_cache,
     )
     llm_future = _executor.submit(
         provider.generate, sys_prompt, usr_prompt, llm_max_tokens,
@@ -247,6 +287,7 @@ def generate_package(req: IdeaRequest) -> dict:
         domain = None
 
     # 3. Build procedural prompts, plan, docs using the REFINED idea + domain context
+    # (pure string templating — no network calls — so this overlaps with llm_future)
     procedural_prompts = build_prompt_pack(
         refined, flags, stack, req.target_users, req.constraints, req.industry,
         mode=mode, domain=domain, tool=tool_profile,
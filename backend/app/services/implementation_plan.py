@@ -1,10 +1,76 @@
 """Granular, phased implementation plan builder."""
 
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Set, Tuple
 
 from app.services.stack_selection import StackChoice
 
 
+# Phase 4 step bodies for production plans, in emission order.  Each entry
+# is (flag, describe) where describe(stack) returns the text after "4.N  ".
+_PRODUCTION_FEATURE_STEPS: Tuple[Tuple[str, Callable[[StackChoice], str]], ...] = (
+    ("realtime", lambda stack: (
+        "Implement real-time layer: WebSocket endpoint, connection manager, "
+        "Redis pub/sub, and frontend useWebSocket hook with auto-reconnect."
+    )),
+    ("payments", lambda stack: (
+        "Integrate Stripe: create customers, checkout sessions, webhook handler "
+        "(subscription lifecycle), pricing page, and billing portal."
+    )),
+    ("ai", lambda stack: (
+        "Build AI integration: LLM service with streaming, prompt manager, "
+        "RAG pipeline (if applicable), and frontend streaming UI component."
+    )),
+    ("file_upload", lambda stack: (
+        "Build file upload system: presigned URL flow, image processing "
+        "(thumbnails, WebP), drag-and-drop UI with progress indicator."
+    )),
+    ("search", lambda stack: (
+        "Implement search: set up " + stack.search + ", indexing pipeline, "
+        "search API with facets, and frontend search bar with autocomplete."
+    )),
+    ("notifications", lambda stack: (
+        "Build notification system: in-app notifications, email via " + stack.email + ", "
+        "notification preferences, and real-time delivery."
+    )),
+    ("social", lambda stack: (
+        "Build social features: user profiles, activity feed, comments with "
+        "threading, reactions, follow/unfollow, and content moderation."
+    )),
+    ("scheduling", lambda stack: (
+        "Build scheduling system: calendar view, availability management, "
+        "booking flow with conflict detection, and email reminders."
+    )),
+    ("analytics", lambda stack: (
+        "Build analytics dashboard: aggregation queries, Recharts visualisations "
+        "(line, bar, pie), stat cards, and date range filtering."
+    )),
+    ("admin_panel", lambda stack: (
+        "Build admin panel: user management, content moderation, "
+        "system configuration, and activity audit log."
+    )),
+    ("multi_tenancy", lambda stack: (
+        "Implement multi-tenancy: organisation model, tenant-scoped queries, "
+        "invite flow, and role-based access within organisations."
+    )),
+    ("auth_advanced", lambda stack: (
+        "Implement advanced auth: OAuth social login (Google + GitHub), "
+        "2FA/MFA with TOTP, RBAC with fine-grained permissions."
+    )),
+    ("i18n", lambda stack: (
+        "Add internationalisation: next-intl setup, translation files, "
+        "locale switcher, RTL support, and date/number formatting."
+    )),
+    ("geolocation", lambda stack: (
+        "Implement geolocation features: map component (Mapbox/Leaflet), "
+        "address autocomplete, proximity search, and distance calculation."
+    )),
+    ("mobile", lambda stack: (
+        "Build mobile-optimised API: composite endpoints, cursor pagination, "
+        "push notifications (FCM), and sync endpoint for offline-first."
+    )),
+)
+
+
 def _entity_names(domain: Optional[Dict]) -> str:
     """Return comma-separated entity names from domain, or empty string."""
     if not domain or "entities" not in domain:
@@ -118,98 +184,12 @@ def build_implementation_plan(flags: Set[str], stack: StackChoice, mode: str = "
     ])
 
     # ── Phase 4: Feature-Specific ────────────────────────────────────
-    feature_steps = []
-    step = 1
-    if "realtime" in flags:
-        feature_steps.append(
-            f"4.{step}  Implement real-time layer: WebSocket endpoint, connection manager, "
-            f"Redis pub/sub, and frontend useWebSocket hook with auto-reconnect."
-        )
-        step += 1
-    if "payments" in flags:
-        feature_steps.append(
-            f"4.{step}  Integrate Stripe: create customers, checkout sessions, webhook handler "
-            f"(subscription lifecycle), pricing page, and billing portal."
-        )
-        step += 1
-    if "ai" in flags:
-        feature_steps.append(
-            f"4.{step}  Build AI integration: LLM service with streaming, prompt manager, "
-            f"RAG pipeline (if applicable), and frontend streaming UI component."
-        )
-        step += 1
-    if "file_upload" in flags:
-        feature_steps.append(
-            f"4.{step}  Build file upload system: presigned URL flow, image processing "
-            f"(thumbnails, WebP), drag-and-drop UI with progress indicator."
-        )
-        step += 1
-    if "search" in flags:
-        feature_steps.append(
-            f"4.{step}  Implement search: set up {stack.search}, indexing pipeline, "
-            f"search API with facets, and frontend search bar with autocomplete."
-        )
-        step += 1
-    if "notifications" in flags:
-        feature_steps.append(
-            f"4.{step}  Build notification system: in-app notifications, email via {stack.email}, "
-            f"notification preferences, and real-time delivery."
-        )
-        step += 1
-    if "social" in flags:
-        feature_steps.append(
-            f"4.{step}  Build social features: user profiles, activity feed, comments with "
-            f"threading, reactions, follow/unfollow, and content moderation."
-        )
-        step += 1
-    if "scheduling" in flags:
-        feature_steps.append(
-            f"4.{step}  Build scheduling system: calendar view, availability management, "
-            f"booking flow with conflict detection, and email reminders."
-        )
-        step += 1
-    if "analytics" in flags:
-        feature_steps.append(
-            f"4.{step}  Build analytics dashboard: aggregation queries, Recharts visualisations "
-            f"(line, bar, pie), stat cards, and date range filtering."
+    feature_steps = [
+        f"4.{step}  {describe(stack)}"
+        for step, describe in enumerate(
+            (describe for flag, describe in _PRODUCTION_FEATURE_STEPS if flag in flags), start=1
         )
-        step += 1
-    if "admin_panel" in flags:
-        feature_steps.append(
-            f"4.{step}  Build admin panel: user management, content moderation, "
-            f"system configuration, and activity audit log."
-        )
-        step += 1
-    if "multi_tenancy" in flags:
-        feature_steps.append(
-            f"4.{step}  Implement multi-tenancy: organisation model, tenant-scoped queries, "
-            f"invite flow, and role-based access within organisations."
-        )
-        step += 1
-    if "auth_advanced" in flags:
-        feature_steps.append(
-            f"4.{step}  Implement advanced auth: OAuth social login (Google + GitHub), "
-            f"2FA/MFA with TOTP, RBAC with fine-grained permissions."
-        )
-        step += 1
-    if "i18n" in flags:
-        feature_steps.append(
-            f"4.{step}  Add internationalisation: next-intl setup, translation files, "
-            f"locale switcher, RTL support, and date/number formatting."
-        )
-        step += 1
-    if "geolocation" in flags:
-        feature_steps.append(
-            f"4.{step}  Implement geolocation features: map component (Mapbox/Leaflet), "
-            f"address autocomplete, proximity search, and distance calculation."
-        )
-        step += 1
-    if "mobile" in flags:
-        feature_steps.append(
-            f"4.{step}  Build mobile-optimised API: composite endpoints, cursor pagination, "
-            f"push notifications (FCM), and sync endpoint for offline-first."
-        )
-        step += 1
+    ]
 
     if feature_steps:
         plan.append("Phase 4 — Feature Integration")
@@ -364,11 +344,12 @@ def _replit_plan(flags: Set[str], stack: StackChoice, domain: Optional[Dict], mo
         plan.append("Phase 4 — Feature Integration")
         plan.extend(feature_steps)
 
+    pn = 5 if feature_steps else 4
     plan.extend([
-        f"Phase {'5' if feature_steps else '4'} — Quality & Launch",
-        f"{'5' if feature_steps else '4'}.1  Test all user flows end-to-end.",
-        f"{'5' if feature_steps else '4'}.2  Add basic error handling and input validation.",
-        f"{'5' if feature_steps else '4'}.3  Deploy via Replit Deployments.",
+        f"Phase {pn} — Quality & Launch",
+        f"{pn}.1  Test all user flows end-to-end.",
+        f"{pn}.2  Add basic error handling and input validation.",
+        f"{pn}.3  Deploy via Replit Deployments.",
     ])
 
     return plan
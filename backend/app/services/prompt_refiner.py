@@ -4,6 +4,7 @@ Takes a vague, poorly-structured prompt and transforms it into a precise,
 structured one-shot prompt that any LLM can execute with high accuracy.
 """
 
+import hashlib
 import json
 import logging
 import re
@@ -130,6 +131,14 @@ imply
 - Do NOT include any text outside the JSON object
 - Do NOT wrap the JSON in markdown code fences"""
 
+_REQUIRED_KEYS = frozenset({"prompt_type", "analysis", "refined_prompt"})
+
+# Stable key so repeat calls hit the provider-side prompt cache.  Derived
+# from the prompt text, so editing the prompt rotates the key automatically.
+REFINER_PROMPT_CACHE_KEY = "refiner-v1-" + hashlib.blake2b(
+    REFINER_SYSTEM_PROMPT.encode(), digest_size=8
+).hexdigest()
+
 
 def _extract_json(text: str) -> dict:
     """Parse JSON from *text*, falling back to regex extraction."""
@@ -155,13 +164,13 @@ def refine_prompt(vague_prompt: str) -> dict:
         max_tokens=4096,
         temperature=0.4,
         response_format={"type": "json_object"},
+        prompt_cache_key=REFINER_PROMPT_CACHE_KEY,
     )
 
     text = (response.choices[0].message.content or "").strip()
     result = _extract_json(text)
 
-    required = {"prompt_type", "analysis", "refined_prompt"}
-    if not required.issubset(result.keys()):
+    if not result.keys() >= _REQUIRED_KEYS:
         raise ValueError("Model response missing required keys.")
 
     return result
@@ -5,8 +5,17 @@ straight into an AI code-generation assistant and produce complete,
 production-grade code with no placeholders or TODOs.
 """
 
-from typing import Dict, List, Optional, Set
-
+import io
+import re
+import string
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import chain
+from operator import itemgetter
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from app.core.cache import TTLCache
 from app.services.stack_selection import StackChoice
 
 
@@ -14,54 +23,79 @@ from app.services.stack_selection import StackChoice
 # Domain context formatters — turn LLM-extracted domain data into prompt text
 # ---------------------------------------------------------------------------
 
-def _domain_entities_block(domain: Optional[Dict]) -> str:
-    """Render domain entities as a structured block for prompts."""
-    if not domain or "entities" not in domain:
+# Shared default for missing list-valued domain fields (no per-call allocation).
+_EMPTY: Tuple = ()
+_get_name = itemgetter("name")
+# Newline for nested f-string expressions, which cannot contain a backslash.
+_NL = "\n"
+
+_ENTITIES_HEADER = sys.intern("\n## Domain Entities (build ALL of these)\n")
+_ENDPOINTS_HEADER = sys.intern(
+    "\n## API Endpoints (implement ALL of these)\n\n"
+    "| Method | Path | Description | Auth |\n"
+    "|--------|------|-------------|------|"
+)
+_PAGES_HEADER = sys.intern("\n## Pages to Build (implement ALL of these)\n")
+_WORKFLOWS_HEADER = sys.intern("\n## Key User Workflows\n")
+
+
+def _domain_view(domain: Optional[Dict]) -> Tuple[Optional[List], Optional[List], Optional[List], Optional[List]]:
+    """Split *domain* into (entities, api_endpoints, pages, workflows).
+
+    A section is ``None`` when the domain does not define it, so callers that
+    need several blocks check the domain once instead of once per block.
+    """
+    if not domain:
+        return None, None, None, None
+    return domain.get("entities"), domain.get("api_endpoints"), domain.get("pages"), domain.get("workflows")
+
+
+def _entity_row(ent: Dict) -> str:
+    table = ent.get("table_name", f"{ent['name'].lower()}s")
+    return (f"- **{ent['name']}** (`{table}`): {ent.get('description', '')}  \n"
+            f"  Fields: {', '.join(ent.get('fields') or _EMPTY)}")
+
+
+def _entities_block(entities: Optional[List[Dict]]) -> str:
+    if entities is None:
         return ""
-    lines = ["\n## Domain Entities (build ALL of these)\n"]
-    for ent in domain["entities"]:
-        fields = ", ".join(ent.get("fields", []))
-        lines.append(f"- **{ent['name']}** (`{ent.get('table_name', ent['name'].lower() + 's')}`): "
-                      f"{ent.get('description', '')}  \n  Fields: {fields}")
-    return "\n".join(lines)
+    return "\n".join(chain((_ENTITIES_HEADER,), map(_entity_row, entities)))
 
 
-def _domain_endpoints_block(domain: Optional[Dict]) -> str:
-    """Render domain API endpoints as a table for prompts."""
-    if not domain or "api_endpoints" not in domain:
+def _endpoints_block(endpoints: Optional[List[Dict]]) -> str:
+    if endpoints is None:
         return ""
-    lines = ["\n## API Endpoints (implement ALL of these)\n",
-             "| Method | Path | Description | Auth |",
-             "|--------|------|-------------|------|"]
-    for ep in domain["api_endpoints"]:
-        lines.append(f"| {ep['method']} | {ep['path']} | {ep.get('description', '')} | {ep.get('auth', 'authenticated')} |")
-    return "\n".join(lines)
+    return "\n".join(chain((_ENDPOINTS_HEADER,), (
+        f"| {ep['method']} | {ep['path']} | {ep.get('description', '')} | {ep.get('auth', 'authenticated')} |"
+        for ep in endpoints
+    )))
 
 
-def _domain_pages_block(domain: Optional[Dict]) -> str:
-    """Render frontend pages as a list for prompts."""
-    if not domain or "pages" not in domain:
+def _pages_block(pages: Optional[List[Dict]]) -> str:
+    if pages is None:
         return ""
-    lines = ["\n## Pages to Build (implement ALL of these)\n"]
-    for pg in domain["pages"]:
-        lines.append(f"- **{pg['name']}** (`{pg.get('path', '')}`): {pg.get('description', '')}")
-    return "\n".join(lines)
+    return "\n".join(chain((_PAGES_HEADER,), (
+        f"- **{pg['name']}** (`{pg.get('path', '')}`): {pg.get('description', '')}"
+        for pg in pages
+    )))
+
 
+# "1. ", "2. ", ... prefixes for numbered workflow rows.
+_INDEX_STRS: Tuple[str, ...] = tuple(f"{i}. " for i in range(1, 129))
 
-def _domain_workflows_block(domain: Optional[Dict]) -> str:
-    """Render user workflows for prompts."""
-    if not domain or "workflows" not in domain:
+
+def _workflows_block(workflows: Optional[List[str]]) -> str:
+    if workflows is None:
         return ""
-    lines = ["\n## Key User Workflows\n"]
-    for i, wf in enumerate(domain["workflows"], 1):
-        lines.append(f"{i}. {wf}")
-    return "\n".join(lines)
+    if len(workflows) <= len(_INDEX_STRS):
+        rows = (f"{idx}{wf}" for idx, wf in zip(_INDEX_STRS, workflows))
+    else:
+        rows = (f"{i}. {wf}" for i, wf in enumerate(workflows, 1))
+    return "\n".join(chain((_WORKFLOWS_HEADER,), rows))
 
 
-def _domain_dir_backend(domain: Optional[Dict]) -> str:
-    """Render backend directory structure with actual entity names."""
-    if not domain or "entities" not in domain:
-        return """```
+# Directory trees used when the domain analysis has no entities / pages.
+_DEFAULT_BACKEND_TREE = """```
 backend/
   app/
     __init__.py
@@ -101,29 +135,47 @@ backend/
   .env.example
 ```"""
 
-    entities = domain["entities"]
-    route_lines = "\n".join(
-        f"        {e.get('table_name', e['name'].lower() + 's')}.py"
-        f"{'':>8}# CRUD routes for {e['name']}"
-        for e in entities
-    )
-    model_lines = "\n".join(
-        f"      {e.get('table_name', e['name'].lower() + 's').rstrip('s')}.py"
-        f"{'':>10}# {e['name']} model — {e.get('description', '')}"
-        for e in entities
-    )
-    schema_lines = "\n".join(
-        f"      {e.get('table_name', e['name'].lower() + 's').rstrip('s')}_schema.py"
-        f"{'':>4}# Pydantic schemas for {e['name']}"
-        for e in entities
-    )
-    service_lines = "\n".join(
-        f"      {e.get('table_name', e['name'].lower() + 's').rstrip('s')}_service.py"
-        f"{'':>4}# Business logic for {e['name']}"
-        for e in entities
-    )
+_DEFAULT_FRONTEND_TREE = """```
+frontend/
+  app/
+    layout.js                 # Root layout: fonts, metadata, global providers
+    page.js                   # Landing / home page
+    globals.css               # Global styles + Tailwind imports
+    (auth)/
+      login/page.js           # Login form
+      register/page.js        # Registration form
+    (dashboard)/
+      layout.js               # Authenticated layout: sidebar, header, auth guard
+      page.js                 # Main dashboard / home
+      [domain]/page.js        # Pages for each core domain feature
+      settings/page.js        # User settings / profile
+    not-found.js              # 404 page
+  components/
+    ui/                       # Reusable UI primitives (Button, Input, Card, Modal, etc.)
+    forms/                    # Domain-specific form components
+    layouts/                  # Sidebar, Header, Footer
+  lib/
+    api-client.js             # Typed fetch wrapper: handles auth headers, errors, refresh
+    auth-context.js           # AuthProvider, useAuth hook, login/logout/register functions
+    utils.js                  # Formatters, classname helpers
+  public/
+    favicon.ico
+  next.config.js
+  tailwind.config.js
+  jsconfig.json (or tsconfig.json)
+```"""
 
-    return f"""```
+
+# Gaps between a file name and its trailing comment in the directory trees.
+_PAD4 = " " * 4
+_PAD6 = " " * 6
+_PAD8 = " " * 8
+_PAD10 = " " * 10
+
+
+# Static pieces of the entity-aware backend tree; the per-entity rows are
+# written between them by _domain_dir_backend.
+_BACKEND_TREE_ROUTES_HEAD = """```
 backend/
   app/
     __init__.py
@@ -133,20 +185,20 @@ backend/
       routes/
         __init__.py
         auth.py               # POST /register, POST /login, POST /logout, POST /refresh
-{route_lines}
-        health.py             # GET /health
+"""
+_BACKEND_TREE_MODELS_HEAD = """        health.py             # GET /health
     models/
       __init__.py
       base.py                 # SQLAlchemy declarative base, common mixins (TimestampMixin)
       user.py                 # User model with hashed password, roles
-{model_lines}
-    schemas/
+"""
+_BACKEND_TREE_SCHEMAS_HEAD = """    schemas/
       __init__.py
-{schema_lines}
-    services/
+"""
+_BACKEND_TREE_SERVICES_HEAD = """    services/
       __init__.py
-{service_lines}
-    core/
+"""
+_BACKEND_TREE_TAIL = """    core/
       __init__.py
       config.py               # Pydantic Settings loading from .env
       database.py             # Async engine, session factory, get_db dependency
@@ -164,46 +216,64 @@ backend/
 ```"""
 
 
+def _write_rows(buf: io.StringIO, rows: Iterable[str]) -> None:
+    """Write *rows* one per line; an empty section still leaves a blank line."""
+    wrote = False
+    for row in rows:
+        buf.write(row)
+        buf.write("\n")
+        wrote = True
+    if not wrote:
+        buf.write("\n")
+
+
+def _domain_dir_backend(domain: Optional[Dict]) -> str:
+    """Render backend directory structure with actual entity names."""
+    if not domain or "entities" not in domain:
+        return _DEFAULT_BACKEND_TREE
+
+    rows = []
+    for e in domain["entities"]:
+        table = e.get("table_name", f"{e['name'].lower()}s")
+        rows.append((e["name"], table, table.rstrip("s"), e.get("description", "")))
+
+    buf = io.StringIO()
+    buf.write(_BACKEND_TREE_ROUTES_HEAD)
+    _write_rows(buf, (f"        {table}.py{_PAD8}# CRUD routes for {name}" for name, table, _, _ in rows))
+    buf.write(_BACKEND_TREE_MODELS_HEAD)
+    _write_rows(buf, (f"      {singular}.py{_PAD10}# {name} model — {desc}" for name, _, singular, desc in rows))
+    buf.write(_BACKEND_TREE_SCHEMAS_HEAD)
+    _write_rows(buf, (f"      {singular}_schema.py{_PAD4}# Pydantic schemas for {name}" for name, _, singular, _ in rows))
+    buf.write(_BACKEND_TREE_SERVICES_HEAD)
+    _write_rows(buf, (f"      {singular}_service.py{_PAD4}# Business logic for {name}" for name, _, singular, _ in rows))
+    buf.write(_BACKEND_TREE_TAIL)
+    return buf.getvalue()
+
+
+# Lower-cases ASCII letters and turns spaces into dashes in one translate pass.
+_SLUG_TABLE = str.maketrans({**{c: c + 32 for c in range(ord("A"), ord("Z") + 1)}, ord(" "): ord("-")})
+
+
+def _slugify(name: str) -> str:
+    """``name.lower().replace(" ", "-")`` with a single pass for ASCII names."""
+    if name.isascii():
+        return name.translate(_SLUG_TABLE)
+    return name.lower().replace(" ", "-")
+
+
 def _domain_dir_frontend(domain: Optional[Dict]) -> str:
     """Render frontend directory structure with actual page names."""
     if not domain or "pages" not in domain:
-        return """```
-frontend/
-  app/
-    layout.js                 # Root layout: fonts, metadata, global providers
-    page.js                   # Landing / home page
-    globals.css               # Global styles + Tailwind imports
-    (auth)/
-      login/page.js           # Login form
-      register/page.js        # Registration form
-    (dashboard)/
-      layout.js               # Authenticated layout: sidebar, header, auth guard
-      page.js                 # Main dashboard / home
-      [domain]/page.js        # Pages for each core domain feature
-      settings/page.js        # User settings / profile
-    not-found.js              # 404 page
-  components/
-    ui/                       # Reusable UI primitives (Button, Input, Card, Modal, etc.)
-    forms/                    # Domain-specific form components
-    layouts/                  # Sidebar, Header, Footer
-  lib/
-    api-client.js             # Typed fetch wrapper: handles auth headers, errors, refresh
-    auth-context.js           # AuthProvider, useAuth hook, login/logout/register functions
-    utils.js                  # Formatters, classname helpers
-  public/
-    favicon.ico
-  next.config.js
-  tailwind.config.js
-  jsconfig.json (or tsconfig.json)
-```"""
+        return _DEFAULT_FRONTEND_TREE
 
-    pages = domain["pages"]
-    page_lines = "\n".join(
-        f"      {pg.get('path', '/' + pg['name'].lower().replace(' ', '-')).lstrip('/').split('/')[-1]}/page.js"
-        f"{'':>6}# {pg['name']} — {pg.get('description', '')}"
-        for pg in pages
-        if pg.get("path", "").startswith("/dashboard") or not pg.get("path", "").startswith("/")
-    )
+    page_rows: List[str] = []
+    for pg in domain["pages"]:
+        path = pg.get("path", "")
+        if path.startswith("/") and not path.startswith("/dashboard"):
+            continue
+        slug = (path or "/" + _slugify(pg["name"])).rpartition("/")[2]
+        page_rows.append(f"      {slug}/page.js{_PAD6}# {pg['name']} — {pg.get('description', '')}")
+    page_lines = "\n".join(page_rows)
 
     return f"""```
 frontend/
@@ -236,17 +306,37 @@ frontend/
 ```"""
 
 
-def _entity_names_short(domain: Optional[Dict]) -> str:
-    """Return a comma-separated list of entity names, or empty string."""
-    if not domain or "entities" not in domain:
-        return ""
-    return ", ".join(e["name"] for e in domain["entities"])
+@dataclass(frozen=True, slots=True)
+class _DomainBlocks:
+    """Every domain-derived block of a prompt pack, rendered once."""
+    entities: str
+    endpoints: str
+    pages: str
+    workflows: str
+    dir_backend: str
+    dir_frontend: str
+    names: str
+
+
+def _render_domain_blocks(domain: Optional[Dict]) -> _DomainBlocks:
+    """Render every domain-derived block once so a pack build can share them."""
+    entities, endpoints, pages, workflows = _domain_view(domain)
+    return _DomainBlocks(
+        entities=_entities_block(entities),
+        endpoints=_endpoints_block(endpoints),
+        pages=_pages_block(pages),
+        workflows=_workflows_block(workflows),
+        dir_backend=_domain_dir_backend(domain),
+        dir_frontend=_domain_dir_frontend(domain),
+        names=", ".join(map(_get_name, entities or _EMPTY)),
+    )
+
 
 # ---------------------------------------------------------------------------
 # Shared quality footer appended to every prompt
 # ---------------------------------------------------------------------------
 
-_QUALITY_FOOTER = """
+_QUALITY_FOOTER = sys.intern("""
 ## Quality Requirements
 - All code must be COMPLETE — no TODOs, no placeholders, no "implement here" comments.
 - Include proper error handling for every operation that can fail.
@@ -261,42 +351,60 @@ showing its path, e.g.:
 ```
 # filepath: backend/app/models/user.py
 ```
-"""
-
-
-def _stack_block(stack: StackChoice, keys: Optional[List[str]] = None) -> str:
+""")
+
+
+def _finalize(body: str, footer: str = _QUALITY_FOOTER) -> str:
+    """Append a shared quality footer (production by default) to a finished prompt body."""
+    return "".join((body, footer))
+
+
+# StackChoice field subsets each builder shows in its tech-stack section.
+_SUBSET_BACKEND = ("backend", "database", "cache", "auth", "ai", "monitoring")
+_SUBSET_FRONTEND = ("frontend", "frontend_ui")
+_SUBSET_DB = ("database",)
+_SUBSET_AUTH = ("auth", "backend", "frontend", "database")
+_SUBSET_API = ("backend", "auth")
+_SUBSET_DEPLOY = ("backend", "frontend", "database", "cache", "infra", "monitoring")
+_SUBSET_TEST = ("backend", "frontend", "testing", "database")
+_SUBSET_SEC = ("backend", "frontend", "auth", "database", "infra")
+_SUBSET_REALTIME = ("backend", "cache", "frontend")
+_SUBSET_PAYMENTS = ("backend", "frontend", "auth", "database")
+_SUBSET_AI = ("backend", "ai", "database", "cache")
+_SUBSET_MOBILE = ("backend", "frontend", "auth")
+_SUBSET_SEARCH = ("backend", "search", "database")
+_SUBSET_FILES = ("backend", "file_storage", "database")
+_SUBSET_MVP_BACKEND = ("backend", "database", "auth")
+_SUBSET_MVP_MASTER = ("frontend", "frontend_ui", "backend", "database", "auth")
+
+
+@lru_cache(maxsize=256)
+def _stack_block(stack: StackChoice, keys: Optional[Tuple[str, ...]] = None) -> str:
     """Render a subset of the stack as a bullet list for prompt injection."""
-    d = stack.to_dict()
+    items = stack.to_dict().items()
     if keys:
-        d = {k: v for k, v in d.items() if k in keys}
-    return "\n".join(f"- **{k.replace('_', ' ').title()}**: {v}" for k, v in d.items() if v != "None")
+        kset = frozenset(keys)
+        rows = ((k, v) for k, v in items if k in kset and v != "None")
+    else:
+        rows = ((k, v) for k, v in items if v != "None")
+    return "\n".join(f"- **{k.replace('_', ' ').title()}**: {v}" for k, v in rows)
 
 
 # ===================================================================
 # CORE PROMPTS (always generated)
 # ===================================================================
 
-def _product_requirements(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    domain_section = ""
-    if domain:
-        entity_list = ", ".join(e["name"] for e in domain.get("entities", []))
-        workflow_text = _domain_workflows_block(domain)
-        domain_section = f"""
-## Domain Model
-Core entities to cover in the PRD: {entity_list}
-{workflow_text}
-"""
-    return f"""You are a senior product manager with 12+ years of experience shipping SaaS products.
+_PRD_TEMPLATE = string.Template("""You are a senior product manager with 12+ years of experience shipping SaaS products.
 Write a **complete Product Requirements Document (PRD)** for the application described below.
 
 ## Application Idea
-{idea}
+${idea}
 
-{f"## Target Users{chr(10)}{target_users}" if target_users else ""}
+${target_users_block}
 
 ## Chosen Tech Stack
-{_stack_block(stack)}
-{domain_section}
+${stack_block}
+${domain_section}
 ## What You Must Include
 
 1. **Problem Statement** — What pain point does this solve? Why now?
@@ -311,36 +419,41 @@ Write a **complete Product Requirements Document (PRD)** for the application des
 7. **Success Metrics** — 5+ specific KPIs with concrete targets (e.g., "DAU/MAU ratio > 40% within 3 months").
 8. **Risks and Mitigations** — At least 5 product risks with mitigation strategies.
 9. **Out of Scope** — Explicitly list what is NOT included in the MVP.
-{_QUALITY_FOOTER}"""
-
-
-def _backend_code(idea: str, target_users: Optional[str], flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    feature_notes = ""
-    if "realtime" in flags:
-        feature_notes += "\n- Implement WebSocket endpoints for real-time features using FastAPI WebSocket support."
-    if "payments" in flags:
-        feature_notes += "\n- Integrate Stripe SDK: products, prices, subscriptions, webhook handler, customer portal."
-    if "ai" in flags:
-        feature_notes += "\n- Integrate OpenAI SDK: chat completions, embeddings. Include prompt versioning and token tracking."
-    if "file_upload" in flags:
-        feature_notes += "\n- Implement presigned-URL upload flow to S3/R2. Include file-type validation and size limits."
-    if "search" in flags:
-        feature_notes += "\n- Implement search indexing and query endpoint via Meilisearch/Elasticsearch."
-    if "scheduling" in flags:
-        feature_notes += "\n- Implement scheduling logic with availability windows, booking conflicts, and reminders."
-    if "notifications" in flags:
-        feature_notes += "\n- Implement notification service: in-app, email (via Resend), and optional SMS."
-    if "multi_tenancy" in flags:
-        feature_notes += "\n- Implement tenant isolation: org-scoped models, middleware to inject current tenant."
-    if "analytics" in flags:
-        feature_notes += "\n- Implement analytics aggregation endpoints for dashboard data."
+""")
 
-    dir_structure = _domain_dir_backend(domain)
-    endpoints_section = _domain_endpoints_block(domain)
-    entities_section = _domain_entities_block(domain)
 
-    if not endpoints_section:
-        endpoints_section = """
+def _product_requirements(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    domain_section = ""
+    if domain:
+        if blocks is None:
+            blocks = _render_domain_blocks(domain)
+        domain_section = f"""
+## Domain Model
+Core entities to cover in the PRD: {blocks.names}
+{blocks.workflows}
+"""
+    return _finalize(_PRD_TEMPLATE.substitute(
+        idea=idea,
+        target_users_block=f"## Target Users\n{target_users}" if target_users else "",
+        stack_block=_stack_block(stack),
+        domain_section=domain_section,
+    ))
+
+
+_BACKEND_FEATURE_NOTES: Dict[str, str] = {
+    "realtime": "\n- Implement WebSocket endpoints for real-time features using FastAPI WebSocket support.",
+    "payments": "\n- Integrate Stripe SDK: products, prices, subscriptions, webhook handler, customer portal.",
+    "ai": "\n- Integrate OpenAI SDK: chat completions, embeddings. Include prompt versioning and token tracking.",
+    "file_upload": "\n- Implement presigned-URL upload flow to S3/R2. Include file-type validation and size limits.",
+    "search": "\n- Implement search indexing and query endpoint via Meilisearch/Elasticsearch.",
+    "scheduling": "\n- Implement scheduling logic with availability windows, booking conflicts, and reminders.",
+    "notifications": "\n- Implement notification service: in-app, email (via Resend), and optional SMS.",
+    "multi_tenancy": "\n- Implement tenant isolation: org-scoped models, middleware to inject current tenant.",
+    "analytics": "\n- Implement analytics aggregation endpoints for dashboard data.",
+}
+
+
+_DEFAULT_ENDPOINTS_BLOCK = sys.intern("""
 ## API Endpoints (implement ALL)
 Design RESTful endpoints for every core entity identified in the idea.
 For each endpoint provide:
@@ -348,17 +461,30 @@ For each endpoint provide:
 - Request body schema (Pydantic model)
 - Response schema (Pydantic model)
 - Auth requirement (public / authenticated / admin)
-- HTTP status codes (201 create, 200 read/update, 204 delete, 400/401/403/404/409/422/500)"""
+- HTTP status codes (201 create, 200 read/update, 204 delete, 400/401/403/404/409/422/500)""")
+
+
+def _backend_code(idea: str, target_users: Optional[str], flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    feature_notes = "".join(note for flag, note in _BACKEND_FEATURE_NOTES.items() if flag in flags)
+
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    dir_structure = blocks.dir_backend
+    endpoints_section = blocks.endpoints
+    entities_section = blocks.entities
+
+    if not endpoints_section:
+        endpoints_section = _DEFAULT_ENDPOINTS_BLOCK
 
-    return f"""You are a senior Python backend engineer specialising in FastAPI.
+    return _finalize(f"""You are a senior Python backend engineer specialising in FastAPI.
 Produce **COMPLETE, WORKING, PRODUCTION-READY** backend code for the application below.
 
 ## Application Idea
 {idea}
-{f"{chr(10)}Target Users: {target_users}" if target_users else ""}
+{f"{_NL}Target Users: {target_users}" if target_users else ""}
 
 ## Tech Stack (use these exact technologies)
-{_stack_block(stack, ["backend", "database", "cache", "auth", "ai", "monitoring"])}
+{_stack_block(stack, _SUBSET_BACKEND)}
 {entities_section}
 
 ## Directory Structure (create ALL of these files)
@@ -395,54 +521,53 @@ For each endpoint provide:
 ## Pagination
 - Standard query params: ``?page=1&per_page=20``
 - Response shape: ``{{"items": [...], "total": N, "page": N, "per_page": N, "pages": N}}``
-{_QUALITY_FOOTER}"""
-
-
-def _frontend_code(idea: str, target_users: Optional[str], flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    feature_notes = ""
-    if "realtime" in flags:
-        feature_notes += "\n- Implement WebSocket client with auto-reconnect for real-time updates."
-    if "payments" in flags:
-        feature_notes += "\n- Build pricing page, checkout flow with Stripe Elements, and subscription management page."
-    if "ai" in flags:
-        feature_notes += "\n- Build AI interaction UI: streaming response display, prompt input, loading states."
-    if "file_upload" in flags:
-        feature_notes += "\n- Build drag-and-drop file upload with progress bar and preview."
-    if "search" in flags:
-        feature_notes += "\n- Build search bar with debounced input, autocomplete dropdown, and results page."
-    if "social" in flags:
-        feature_notes += "\n- Build user profile pages, activity feed, comment threads, and follow/unfollow."
-    if "analytics" in flags:
-        feature_notes += "\n- Build dashboard page with Recharts: line charts, bar charts, stat cards."
-    if "scheduling" in flags:
-        feature_notes += "\n- Build calendar view, booking form, and availability picker."
-
-    dir_structure = _domain_dir_frontend(domain)
-    pages_section = _domain_pages_block(domain)
-    workflows_section = _domain_workflows_block(domain)
+""")
 
-    if not pages_section:
-        pages_section = """
-## Pages to Build (based on the idea)
-Analyse the idea and build pages for every core workflow."""
 
-    pages_section += """
+_DEFAULT_PAGES_BLOCK = sys.intern("""
+## Pages to Build (based on the idea)
+Analyse the idea and build pages for every core workflow.""")
+_PAGE_REQUIREMENTS_BLOCK = sys.intern("""
 Each page must include:
 - Proper loading states (skeleton UI)
 - Error states with retry option
 - Empty states with call-to-action
 - Responsive layout (mobile-first)
-- Proper SEO: page title, meta description"""
+- Proper SEO: page title, meta description""")
+
+
+_FRONTEND_FEATURE_NOTES: Dict[str, str] = {
+    "realtime": "\n- Implement WebSocket client with auto-reconnect for real-time updates.",
+    "payments": "\n- Build pricing page, checkout flow with Stripe Elements, and subscription management page.",
+    "ai": "\n- Build AI interaction UI: streaming response display, prompt input, loading states.",
+    "file_upload": "\n- Build drag-and-drop file upload with progress bar and preview.",
+    "search": "\n- Build search bar with debounced input, autocomplete dropdown, and results page.",
+    "social": "\n- Build user profile pages, activity feed, comment threads, and follow/unfollow.",
+    "analytics": "\n- Build dashboard page with Recharts: line charts, bar charts, stat cards.",
+    "scheduling": "\n- Build calendar view, booking form, and availability picker.",
+}
+
+
+def _frontend_code(idea: str, target_users: Optional[str], flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    feature_notes = "".join(note for flag, note in _FRONTEND_FEATURE_NOTES.items() if flag in flags)
+
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    dir_structure = blocks.dir_frontend
+    pages_section = blocks.pages
+    workflows_section = blocks.workflows
 
-    return f"""You are a senior frontend engineer specialising in Next.js and React.
+    pages_section = "".join((pages_section or _DEFAULT_PAGES_BLOCK, _PAGE_REQUIREMENTS_BLOCK))
+
+    return _finalize(f"""You are a senior frontend engineer specialising in Next.js and React.
 Produce **COMPLETE, WORKING, PRODUCTION-READY** frontend code for the application below.
 
 ## Application Idea
 {idea}
-{f"{chr(10)}Target Users: {target_users}" if target_users else ""}
+{f"{_NL}Target Users: {target_users}" if target_users else ""}
 
 ## Tech Stack (use these exact technologies)
-{_stack_block(stack, ["frontend", "frontend_ui"])}
+{_stack_block(stack, _SUBSET_FRONTEND)}
 - Forms: react-hook-form + zod validation
 - HTTP client: fetch API with a typed wrapper (no axios)
 - State: React Context for auth state; component-local state for everything else (or Zustand if complex)
@@ -473,45 +598,48 @@ Produce **COMPLETE, WORKING, PRODUCTION-READY** frontend code for the applicatio
 - Show field-level validation errors
 - Disable submit button while loading
 - Show toast/notification on success or error
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _database_schema(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    extra = ""
-    if "multi_tenancy" in flags:
-        extra += "\n- Add ``tenant_id`` (FK) to every tenant-scoped table and Row-Level Security policies."
-    if "ai" in flags:
-        extra += "\n- Include a ``vector`` column (pgvector) for embedding storage where relevant."
-    if "scheduling" in flags:
-        extra += "\n- Include ``tstzrange`` columns for availability windows with exclusion constraints."
-    if "analytics" in flags:
-        extra += "\n- Include a hypertable or partitioned events table for time-series analytics data."
-
-    entities_section = _domain_entities_block(domain)
+_DATABASE_EXTRAS: Dict[str, str] = {
+    "multi_tenancy": "\n- Add ``tenant_id`` (FK) to every tenant-scoped table and Row-Level Security policies.",
+    "ai": "\n- Include a ``vector`` column (pgvector) for embedding storage where relevant.",
+    "scheduling": "\n- Include ``tstzrange`` columns for availability windows with exclusion constraints.",
+    "analytics": "\n- Include a hypertable or partitioned events table for time-series analytics data.",
+}
+
+
+_ENTITY_DESIGN_TAIL = sys.intern("""
+   - Primary key: UUID v4 (``gen_random_uuid()``)
+   - Timestamps: ``created_at TIMESTAMPTZ DEFAULT now()``, ``updated_at TIMESTAMPTZ``""")
+
+
+def _database_schema(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    extra = "".join(note for flag, note in _DATABASE_EXTRAS.items() if flag in flags)
+
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities_section = blocks.entities
     if entities_section:
         entity_design = f"""{entities_section}
 
 1. **Entity Design** — Create tables for ALL the entities listed above. For each:
    - Table name (snake_case, plural)
-   - ALL columns listed above PLUS any additional columns you identify, with: name, type (PostgreSQL types), nullable, default, constraints
-   - Primary key: UUID v4 (``gen_random_uuid()``)
-   - Timestamps: ``created_at TIMESTAMPTZ DEFAULT now()``, ``updated_at TIMESTAMPTZ``"""
+   - ALL columns listed above PLUS any additional columns you identify, with: name, type (PostgreSQL types), nullable, default, constraints{_ENTITY_DESIGN_TAIL}"""
     else:
         entity_design = """
 1. **Entity Design** — Identify every entity from the idea. For each entity provide:
    - Table name (snake_case, plural)
-   - ALL columns with: name, type (use PostgreSQL types), nullable, default, constraints
-   - Primary key: UUID v4 (``gen_random_uuid()``)
-   - Timestamps: ``created_at TIMESTAMPTZ DEFAULT now()``, ``updated_at TIMESTAMPTZ``"""
+   - ALL columns with: name, type (use PostgreSQL types), nullable, default, constraints""" + _ENTITY_DESIGN_TAIL
 
-    return f"""You are a senior database architect specialising in PostgreSQL.
+    return _finalize(f"""You are a senior database architect specialising in PostgreSQL.
 Produce a **COMPLETE, MIGRATION-READY** database schema for the application below.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["database"])}
+{_stack_block(stack, _SUBSET_DB)}
 
 ## Requirements
 {entity_design}
@@ -532,7 +660,7 @@ Produce a **COMPLETE, MIGRATION-READY** database schema for the application belo
 6. **Seed Data** — A Python seed script (``backend/scripts/seed.py``) that inserts realistic sample data
    for development (at least 5 rows per table).
 {extra}
-{_QUALITY_FOOTER}"""
+""")
 
 
 def _auth_setup(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
@@ -552,14 +680,14 @@ def _auth_setup(idea: str, flags: Set[str], stack: StackChoice, domain: Optional
 - Implement invite flow: admin invites user by email → user registers → auto-joins org
 """
 
-    return f"""You are a senior security engineer specialising in authentication and authorization.
+    return _finalize(f"""You are a senior security engineer specialising in authentication and authorization.
 Produce **COMPLETE, PRODUCTION-READY** authentication and authorization code.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["auth", "backend", "frontend", "database"])}
+{_stack_block(stack, _SUBSET_AUTH)}
 
 ## Backend Auth (FastAPI)
 
@@ -584,21 +712,23 @@ Produce **COMPLETE, PRODUCTION-READY** authentication and authorization code.
 2. **Token Storage** — Store access token in memory, refresh token in httpOnly cookie
 3. **Auth Guard** — Wrapper component / middleware that redirects to /login if unauthenticated
 4. **Pages**: Login, Register, Forgot Password, Reset Password (with token from email link)
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _api_documentation(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    endpoints_ref = _domain_endpoints_block(domain)
-    entities_ref = _domain_entities_block(domain)
+def _api_documentation(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    endpoints_ref = blocks.endpoints
+    entities_ref = blocks.entities
 
-    return f"""You are a senior API designer. Produce a **COMPLETE OpenAPI 3.0 specification** (YAML)
+    return _finalize(f"""You are a senior API designer. Produce a **COMPLETE OpenAPI 3.0 specification** (YAML)
 for the application below, plus a human-readable API reference document in Markdown.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "auth"])}
+{_stack_block(stack, _SUBSET_API)}
 {entities_ref}
 {endpoints_ref}
 
@@ -626,26 +756,32 @@ for the application below, plus a human-readable API reference document in Markd
 Produce two outputs:
 - ``openapi.yaml`` — Full OpenAPI 3.0 spec
 - ``API_REFERENCE.md`` — Human-readable endpoint reference
-{_QUALITY_FOOTER}"""
+""")
+
+
+_DEPLOYMENT_NOTES: Dict[str, str] = {
+    "realtime": "\n- Configure sticky sessions or WebSocket-compatible load balancer.",
+    "search": "\n- Include {stack_search} service in docker-compose.",
+}
+# Always appended regardless of stack.cache, matching the output this builder has always produced.
+_DEPLOYMENT_REDIS_NOTE = "\n- Include Redis service in docker-compose with persistence."
 
 
 def _deployment_config(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    extra = ""
-    if "realtime" in flags:
-        extra += "\n- Configure sticky sessions or WebSocket-compatible load balancer."
-    if "search" in flags:
-        extra += f"\n- Include {stack.search} service in docker-compose."
-    if "cache" != "None":
-        extra += "\n- Include Redis service in docker-compose with persistence."
-
-    return f"""You are a senior DevOps engineer. Produce **COMPLETE, PRODUCTION-READY** deployment
+    extra = "".join(
+        note.format(stack_search=stack.search) if flag == "search" else note
+        for flag, note in _DEPLOYMENT_NOTES.items()
+        if flag in flags
+    ) + _DEPLOYMENT_REDIS_NOTE
+
+    return _finalize(f"""You are a senior DevOps engineer. Produce **COMPLETE, PRODUCTION-READY** deployment
 and infrastructure configuration for the application below.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "frontend", "database", "cache", "infra", "monitoring"])}
+{_stack_block(stack, _SUBSET_DEPLOY)}
 
 ## Deliverables (create ALL files)
 
@@ -681,38 +817,43 @@ services:
 - Run ``alembic upgrade head`` as a pre-deploy step
 - Include a health check that verifies DB connectivity
 {extra}
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _testing_suite(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    extra = ""
-    if "payments" in flags:
-        extra += "\n- Mock Stripe API calls using stripe-mock or pytest fixtures."
-    if "ai" in flags:
-        extra += "\n- Mock OpenAI API responses with deterministic fixtures."
-    if "realtime" in flags:
-        extra += "\n- Test WebSocket connections using httpx AsyncClient WebSocket support."
-
-    # Build specific test file list from domain entities
-    test_files = "- ``test_auth.py`` — Register, login, refresh, logout, invalid credentials, expired tokens\n"
+def _test_file_rows(domain: Optional[Dict]) -> Iterator[str]:
+    """Yield the test-file bullet rows, one per domain entity when known."""
+    yield "- ``test_auth.py`` — Register, login, refresh, logout, invalid credentials, expired tokens"
     if domain and "entities" in domain:
         for ent in domain["entities"]:
-            tname = ent.get("table_name", ent["name"].lower() + "s")
-            test_files += (f"- ``test_{tname}.py`` — {ent['name']} CRUD operations, validation errors, "
-                           f"auth requirements, pagination, edge cases\n")
+            tname = ent.get("table_name", f"{ent['name'].lower()}s")
+            yield (f"- ``test_{tname}.py`` — {ent['name']} CRUD operations, validation errors, "
+                   f"auth requirements, pagination, edge cases")
     else:
-        test_files += ("- ``test_[domain].py`` — For each domain entity: CRUD operations, validation errors,\n"
-                       "  auth requirements, pagination, edge cases\n")
-    test_files += "- ``test_middleware.py`` — Error handler, rate limiting"
+        yield ("- ``test_[domain].py`` — For each domain entity: CRUD operations, validation errors,\n"
+               "  auth requirements, pagination, edge cases")
+    yield "- ``test_middleware.py`` — Error handler, rate limiting"
 
-    return f"""You are a senior QA engineer. Produce a **COMPLETE, READY-TO-RUN** test suite
+
+_TESTING_NOTES: Dict[str, str] = {
+    "payments": "\n- Mock Stripe API calls using stripe-mock or pytest fixtures.",
+    "ai": "\n- Mock OpenAI API responses with deterministic fixtures.",
+    "realtime": "\n- Test WebSocket connections using httpx AsyncClient WebSocket support.",
+}
+
+
+def _testing_suite(idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    extra = "".join(note for flag, note in _TESTING_NOTES.items() if flag in flags)
+
+    test_files = "\n".join(_test_file_rows(domain))
+
+    return _finalize(f"""You are a senior QA engineer. Produce a **COMPLETE, READY-TO-RUN** test suite
 for the application below.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "frontend", "testing", "database"])}
+{_stack_block(stack, _SUBSET_TEST)}
 
 ## Backend Tests (pytest)
 
@@ -751,30 +892,35 @@ for the application below.
 - ``e2e/auth.spec.js`` — Full registration → login → dashboard flow
 - ``e2e/[core_feature].spec.js`` — Happy-path workflow for each major feature
 {extra}
-{_QUALITY_FOOTER}"""
+""")
+
+
+# Industry keywords (plain substrings, case-insensitive) -> compliance note.
+_COMPLIANCE_NOTES: Tuple[Tuple["re.Pattern[str]", str], ...] = (
+    (re.compile(r"health|medical|hipaa", re.IGNORECASE),
+     "\n- **HIPAA**: PHI encryption at rest and in transit, audit logging, BAA with cloud provider, minimum necessary access."),
+    (re.compile(r"finance|fintech|banking|pci", re.IGNORECASE),
+     "\n- **PCI-DSS**: Tokenize card data (never store raw), use Stripe for payment handling, quarterly vulnerability scans."),
+    (re.compile(r"eu|gdpr|europe", re.IGNORECASE),
+     "\n- **GDPR**: Cookie consent, data export endpoint, right-to-deletion endpoint, DPA with processors."),
+)
 
 
 def _security_checklist(idea: str, flags: Set[str], stack: StackChoice, industry: Optional[str], domain: Optional[Dict] = None) -> str:
     compliance = ""
     if industry:
-        industry_lower = industry.lower()
-        if any(k in industry_lower for k in ["health", "medical", "hipaa"]):
-            compliance += "\n- **HIPAA**: PHI encryption at rest and in transit, audit logging, BAA with cloud provider, minimum necessary access."
-        if any(k in industry_lower for k in ["finance", "fintech", "banking", "pci"]):
-            compliance += "\n- **PCI-DSS**: Tokenize card data (never store raw), use Stripe for payment handling, quarterly vulnerability scans."
-        if any(k in industry_lower for k in ["eu", "gdpr", "europe"]):
-            compliance += "\n- **GDPR**: Cookie consent, data export endpoint, right-to-deletion endpoint, DPA with processors."
+        compliance = "".join(note for pattern, note in _COMPLIANCE_NOTES if pattern.search(industry))
     if not compliance:
         compliance = "\n- **GDPR basics**: Cookie consent banner, privacy policy page, data deletion capability."
 
-    return f"""You are a senior application security engineer. Produce a **COMPLETE security
+    return _finalize(f"""You are a senior application security engineer. Produce a **COMPLETE security
 hardening guide and implementation checklist** for the application below.
 
 ## Application Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "frontend", "auth", "database", "infra"])}
+{_stack_block(stack, _SUBSET_SEC)}
 
 ## Security Checklist (implement or verify ALL)
 
@@ -827,22 +973,21 @@ hardening guide and implementation checklist** for the application below.
 - Log all authentication events (login, failed login, password reset)
 - Alert on anomalous patterns (spike in 401s, unusual geolocations)
 - Document incident response runbook: detection → containment → recovery → postmortem
-{_QUALITY_FOOTER}"""
+""")
 
 
 # ===================================================================
 # CONDITIONAL PROMPTS (only when feature flag is detected)
 # ===================================================================
 
-def _realtime_implementation(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior backend engineer specialising in real-time systems.
+_REALTIME_TEMPLATE = string.Template("""You are a senior backend engineer specialising in real-time systems.
 Produce **COMPLETE, PRODUCTION-READY** real-time communication code.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "cache", "frontend"])}
+${stack_block}
 
 ## Backend (FastAPI WebSockets)
 
@@ -853,9 +998,9 @@ Produce **COMPLETE, PRODUCTION-READY** real-time communication code.
 
 2. **WebSocket Endpoint** (``app/api/routes/ws.py``):
    - ``/ws?token=<jwt>`` — authenticate via query param JWT
-   - Parse incoming messages as JSON: ``{{"type": "...", "payload": {{...}}}}``
+   - Parse incoming messages as JSON: ``{"type": "...", "payload": {...}}``
    - Route to appropriate handler based on ``type``
-   - Send outgoing messages as JSON: ``{{"type": "...", "payload": {{...}}, "timestamp": "..."}}``
+   - Send outgoing messages as JSON: ``{"type": "...", "payload": {...}, "timestamp": "..."}``
 
 3. **Event Types** (derive from the idea):
    - Define specific event types for the application's real-time features
@@ -880,18 +1025,21 @@ Produce **COMPLETE, PRODUCTION-READY** real-time communication code.
    - Connection status indicator (green/yellow/red dot)
    - Live data updates without page refresh
    - Optimistic UI updates with rollback on failure
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _payment_integration(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior backend engineer specialising in payment systems.
+def _realtime_implementation(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_REALTIME_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_REALTIME)))
+
+
+_PAYMENT_TEMPLATE = string.Template("""You are a senior backend engineer specialising in payment systems.
 Produce **COMPLETE, PRODUCTION-READY** Stripe payment integration code.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "frontend", "auth", "database"])}
+${stack_block}
 - Payments: Stripe Python SDK (stripe) + Stripe.js + @stripe/react-stripe-js
 
 ## Backend
@@ -936,18 +1084,21 @@ Produce **COMPLETE, PRODUCTION-READY** Stripe payment integration code.
    - Show current plan, next billing date, payment method
    - "Manage Subscription" button → Stripe Customer Portal
    - Handle plan changes and cancellations
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _ai_integration(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior AI/ML engineer specialising in LLM integration.
+def _payment_integration(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_PAYMENT_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_PAYMENTS)))
+
+
+_AI_TEMPLATE = string.Template("""You are a senior AI/ML engineer specialising in LLM integration.
 Produce **COMPLETE, PRODUCTION-READY** AI integration code.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "ai", "database", "cache"])}
+${stack_block}
 
 ## Backend
 
@@ -961,7 +1112,7 @@ Produce **COMPLETE, PRODUCTION-READY** AI integration code.
 
 2. **Prompt Manager** (``app/services/prompt_manager.py``):
    - Store prompt templates with versioning
-   - Variable interpolation: ``{{user_name}}``, ``{{context}}``
+   - Variable interpolation: ``{user_name}``, ``{context}``
    - A/B test different prompt versions (optional)
 
 3. **RAG Pipeline** (if relevant to the idea) (``app/services/rag.py``):
@@ -988,18 +1139,21 @@ Produce **COMPLETE, PRODUCTION-READY** AI integration code.
    - Connect to SSE endpoint with auth header
    - Parse incoming events
    - Handle connection errors and retries
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _mobile_api(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior mobile API architect. Produce a **COMPLETE design and implementation**
+def _ai_integration(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_AI_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_AI)))
+
+
+_MOBILE_TEMPLATE = string.Template("""You are a senior mobile API architect. Produce a **COMPLETE design and implementation**
 for a mobile-optimized API layer.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "frontend", "auth"])}
+${stack_block}
 
 ## Requirements
 
@@ -1026,17 +1180,20 @@ for a mobile-optimized API layer.
    - Biometric auth support (device-side, API provides long-lived refresh token)
    - Token refresh without user interaction
    - Device fingerprinting for security alerts
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _search_implementation(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior search engineer. Produce **COMPLETE, PRODUCTION-READY** search implementation.
+def _mobile_api(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_MOBILE_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_MOBILE)))
+
+
+_SEARCH_TEMPLATE = string.Template("""You are a senior search engineer. Produce **COMPLETE, PRODUCTION-READY** search implementation.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "search", "database"])}
+${stack_block}
 
 ## Requirements
 
@@ -1054,7 +1211,7 @@ def _search_implementation(idea: str, stack: StackChoice, domain: Optional[Dict]
 
 3. **Search API** (``app/api/routes/search.py``):
    - ``GET /api/search?q=<query>&type=<entity>&filters=<json>&sort=<field>&page=<n>``
-   - Response: ``{{"hits": [...], "total": N, "query": "...", "facets": {{...}}}}``
+   - Response: ``{"hits": [...], "total": N, "query": "...", "facets": {...}}``
    - Faceted search: return counts per category/tag
    - Highlight matching terms in results
 
@@ -1064,18 +1221,21 @@ def _search_implementation(idea: str, stack: StackChoice, domain: Optional[Dict]
    - Results page with facet sidebar and result cards
    - "No results" state with suggestions
    - Search analytics: track popular queries
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _file_upload_system(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    return f"""You are a senior backend engineer specialising in file handling and cloud storage.
+def _search_implementation(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_SEARCH_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_SEARCH)))
+
+
+_FILE_UPLOAD_TEMPLATE = string.Template("""You are a senior backend engineer specialising in file handling and cloud storage.
 Produce **COMPLETE, PRODUCTION-READY** file upload system.
 
 ## Application Idea
-{idea}
+${idea}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "file_storage", "database"])}
+${stack_block}
 
 ## Requirements
 
@@ -1097,9 +1257,9 @@ Produce **COMPLETE, PRODUCTION-READY** file upload system.
    - Polymorphic association: uploads can be attached to any entity via ``entity_type`` + ``entity_id``
 
 4. **API Endpoints**:
-   - ``POST /api/uploads/presign`` → {{"upload_url": "...", "file_key": "..."}}
-   - ``POST /api/uploads/confirm`` → {{"id": "...", "url": "..."}}
-   - ``DELETE /api/uploads/{{id}}``
+   - ``POST /api/uploads/presign`` → {"upload_url": "...", "file_key": "..."}
+   - ``POST /api/uploads/confirm`` → {"id": "...", "url": "..."}
+   - ``DELETE /api/uploads/{id}``
    - ``GET /api/uploads?entity_type=...&entity_id=...`` → list uploads for an entity
 
 5. **Frontend Upload Component** (``components/ui/FileUpload.js``):
@@ -1109,14 +1269,18 @@ Produce **COMPLETE, PRODUCTION-READY** file upload system.
    - Preview: image thumbnail, document icon, video player
    - Multi-file upload support
    - Remove / replace uploaded file
-{_QUALITY_FOOTER}"""
+""")
+
+
+def _file_upload_system(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
+    return _finalize(_FILE_UPLOAD_TEMPLATE.substitute(idea=idea, stack_block=_stack_block(stack, _SUBSET_FILES)))
 
 
 # ===================================================================
 # MVP PROMPTS (lean, 3 essentials only)
 # ===================================================================
 
-_MVP_QUALITY = """
+_MVP_QUALITY = sys.intern("""
 ## Quality Requirements
 - All code must be COMPLETE — no TODOs, no placeholders.
 - Include basic error handling for critical operations.
@@ -1127,28 +1291,33 @@ Produce the code as a series of complete files. Precede each file with:
 ```
 # filepath: path/to/file.py
 ```
-"""
+""")
 
 
-def _mvp_backend(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    entities_section = _domain_entities_block(domain)
-    endpoints_section = _domain_endpoints_block(domain)
-
-    if not endpoints_section:
-        endpoints_section = """## Endpoints
+_MVP_DEFAULT_ENDPOINTS_BLOCK = sys.intern("""## Endpoints
 Derive REST endpoints from the idea. At minimum:
 - POST /auth/register, POST /auth/login
 - CRUD for each core entity (GET list, GET by id, POST, PUT, DELETE)
-- GET /health"""
+- GET /health""")
 
-    return f"""You are a backend engineer. Build a **minimal working backend** (MVP) as fast as possible.
+
+def _mvp_backend(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities_section = blocks.entities
+    endpoints_section = blocks.endpoints
+
+    if not endpoints_section:
+        endpoints_section = _MVP_DEFAULT_ENDPOINTS_BLOCK
+
+    return _finalize(f"""You are a backend engineer. Build a **minimal working backend** (MVP) as fast as possible.
 
 ## Idea
 {idea}
-{f"{chr(10)}Target Users: {target_users}" if target_users else ""}
+{f"{_NL}Target Users: {target_users}" if target_users else ""}
 
 ## Tech Stack
-{_stack_block(stack, ["backend", "database", "auth"])}
+{_stack_block(stack, _SUBSET_MVP_BACKEND)}
 {entities_section}
 
 ## Keep It Simple
@@ -1167,24 +1336,26 @@ Derive REST endpoints from the idea. At minimum:
 - One Alembic initial migration
 
 {endpoints_section}
-{_MVP_QUALITY}"""
+""", _MVP_QUALITY)
 
 
-def _mvp_frontend(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    pages_section = _domain_pages_block(domain)
+def _mvp_frontend(idea: str, target_users: Optional[str], stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    pages_section = blocks.pages
 
     if not pages_section:
         pages_section = """## Pages
 - Landing, Login, Register, Dashboard (main feature), Settings"""
 
-    return f"""You are a frontend engineer. Build a **minimal working frontend** (MVP) as fast as possible.
+    return _finalize(f"""You are a frontend engineer. Build a **minimal working frontend** (MVP) as fast as possible.
 
 ## Idea
 {idea}
-{f"{chr(10)}Target Users: {target_users}" if target_users else ""}
+{f"{_NL}Target Users: {target_users}" if target_users else ""}
 
 ## Tech Stack
-{_stack_block(stack, ["frontend", "frontend_ui"])}
+{_stack_block(stack, _SUBSET_FRONTEND)}
 
 ## Keep It Simple
 - Use Next.js App Router with minimal pages
@@ -1213,19 +1384,21 @@ lib/
 - Dashboard shows the core feature of the app
 - Logout button
 - Mobile-friendly layout
-{_MVP_QUALITY}"""
+""", _MVP_QUALITY)
 
 
-def _mvp_database(idea: str, stack: StackChoice, domain: Optional[Dict] = None) -> str:
-    entities_section = _domain_entities_block(domain)
+def _mvp_database(idea: str, stack: StackChoice, domain: Optional[Dict] = None, blocks: Optional[_DomainBlocks] = None) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities_section = blocks.entities
 
-    return f"""You are a database engineer. Design a **minimal database schema** for an MVP.
+    return _finalize(f"""You are a database engineer. Design a **minimal database schema** for an MVP.
 
 ## Idea
 {idea}
 
 ## Tech Stack
-{_stack_block(stack, ["database"])}
+{_stack_block(stack, _SUBSET_DB)}
 {entities_section}
 
 ## Keep It Simple
@@ -1240,40 +1413,25 @@ def _mvp_database(idea: str, stack: StackChoice, domain: Optional[Dict] = None)
 1. SQLAlchemy models in ``app/models.py``
 2. Alembic migration: ``alembic/versions/001_initial.py``
 3. Brief seed script: ``scripts/seed.py`` (3 rows per table)
-{_MVP_QUALITY}"""
+""", _MVP_QUALITY)
 
 
 # ===================================================================
 # MASTER PROMPTS — single "build it all" prompt
 # ===================================================================
 
-def _master_prompt_production(
-    idea: str,
-    target_users: Optional[str],
-    flags: Set[str],
-    stack: StackChoice,
-    industry: Optional[str],
-    domain: Optional[Dict] = None,
-) -> str:
-    """Generate a single comprehensive prompt to build the entire production app."""
-    entities_section = _domain_entities_block(domain)
-    endpoints_section = _domain_endpoints_block(domain)
-    pages_section = _domain_pages_block(domain)
-    workflows_section = _domain_workflows_block(domain)
-
-    # Feature integrations
-    feature_sections = ""
-    if "realtime" in flags:
-        feature_sections += """
+# Per-flag sections of the production master prompt; "search" is formatted
+# with the chosen search engine.
+_MASTER_FEATURE_SECTIONS: Dict[str, str] = {
+    "realtime": """
 ### Real-Time Features
 - Implement WebSocket endpoint at ``/ws?token=<jwt>`` using FastAPI WebSocket support
 - Build WebSocket connection manager with room-based broadcasting
 - Use Redis pub/sub for multi-worker message distribution
 - Frontend: ``useWebSocket`` hook with auto-reconnect (exponential backoff)
 - Show connection status indicator in the UI
-"""
-    if "payments" in flags:
-        feature_sections += """
+""",
+    "payments": """
 ### Payment Integration (Stripe)
 - Create Stripe customers on user registration
 - Implement checkout session creation and billing portal
@@ -1281,9 +1439,8 @@ def _master_prompt_production(
 - Build pricing page with plan cards and checkout flow
 - Build subscription management in user settings
 - Store subscription status in database with Stripe IDs
-"""
-    if "ai" in flags:
-        feature_sections += """
+""",
+    "ai": """
 ### AI / LLM Integration
 - Build LLM service with streaming support (``generate`` + ``generate_stream``)
 - Implement SSE endpoint for real-time AI responses
@@ -1291,72 +1448,94 @@ def _master_prompt_production(
 - Frontend: streaming text display with stop button and markdown rendering
 - Rate limit AI requests (10/min per user)
 - Track token usage and costs
-"""
-    if "file_upload" in flags:
-        feature_sections += """
+""",
+    "file_upload": """
 ### File Upload System
 - Implement presigned URL upload flow to S3/R2
 - Generate thumbnails and WebP conversions for images
 - File type whitelist + size limits (10MB images, 50MB docs)
 - Frontend: drag-and-drop upload with progress bar and preview
-"""
-    if "search" in flags:
-        feature_sections += f"""
+""",
+    "search": """
 ### Search
-- Set up {stack.search} with indexes for each searchable entity
+- Set up {stack_search} with indexes for each searchable entity
 - Implement search indexing pipeline (index on create/update, remove on delete)
 - Build search API with faceted filtering and result highlighting
 - Frontend: debounced search bar with autocomplete dropdown
-"""
-    if "scheduling" in flags:
-        feature_sections += """
+""",
+    "scheduling": """
 ### Scheduling
 - Implement availability windows with conflict detection
 - Build booking flow with confirmation and reminders
 - Frontend: calendar view and availability picker
-"""
-    if "notifications" in flags:
-        feature_sections += """
+""",
+    "notifications": """
 ### Notifications
 - Build notification service: in-app, email (via Resend)
 - Store notification preferences per user
 - Implement real-time notification delivery
-"""
-    if "multi_tenancy" in flags:
-        feature_sections += """
+""",
+    "multi_tenancy": """
 ### Multi-Tenancy
 - Organization model with tenant-scoped queries
 - Middleware to inject current tenant from JWT
 - Invite flow: admin invites by email → user joins org
 - Role-based access within organizations
-"""
-    if "analytics" in flags:
-        feature_sections += """
+""",
+    "analytics": """
 ### Analytics Dashboard
 - Build aggregation queries for key metrics
 - Frontend: Recharts dashboard with line/bar charts, stat cards, date filtering
-"""
-    if "social" in flags:
-        feature_sections += """
+""",
+    "social": """
 ### Social Features
 - User profiles with avatar and bio
 - Activity feed with pagination
 - Comment threads with nested replies
 - Follow/unfollow system
-"""
+""",
+}
 
-    dir_backend = _domain_dir_backend(domain)
-    dir_frontend = _domain_dir_frontend(domain)
 
-    return f"""You are a senior full-stack engineer with 15+ years of experience.
+def _master_prompt_production(
+    idea: str,
+    target_users: Optional[str],
+    flags: Set[str],
+    stack: StackChoice,
+    industry: Optional[str],
+    domain: Optional[Dict] = None,
+    blocks: Optional[_DomainBlocks] = None,
+) -> str:
+    """Generate a single comprehensive prompt to build the entire production app."""
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities_section = blocks.entities
+    endpoints_section = blocks.endpoints
+    pages_section = blocks.pages
+    workflows_section = blocks.workflows
+
+    # Feature integrations
+    feature_sections = "".join(
+        section.format(stack_search=stack.search) if flag == "search" else section
+        for flag, section in _MASTER_FEATURE_SECTIONS.items()
+        if flag in flags
+    )
+
+    dir_backend = blocks.dir_backend
+    dir_frontend = blocks.dir_frontend
+    users_line = f"\n**Target Users:** {target_users}" if target_users else ""
+    industry_line = f"\n**Industry:** {industry}" if industry else ""
+    features_heading = f"## Feature Integrations{feature_sections}" if feature_sections else ""
+
+    return _finalize(f"""You are a senior full-stack engineer with 15+ years of experience.
 Build the **COMPLETE, PRODUCTION-READY** application described below.
 Generate ALL code files — backend, frontend, database, auth, deployment — in a single response.
 Do NOT leave any placeholders, TODOs, or "implement here" comments.
 
 ## Project Description
 {idea}
-{f"{chr(10)}**Target Users:** {target_users}" if target_users else ""}
-{f"{chr(10)}**Industry:** {industry}" if industry else ""}
+{users_line}
+{industry_line}
 
 ## Tech Stack (use these exact technologies)
 {_stack_block(stack)}
@@ -1400,7 +1579,7 @@ Do NOT leave any placeholders, TODOs, or "implement here" comments.
 - Loading states (skeleton UI), error states (with retry), empty states
 - Responsive (mobile-first), SEO (page titles, meta descriptions)
 - Toast notifications for success/error feedback
-{f"## Feature Integrations{feature_sections}" if feature_sections else ""}
+{features_heading}
 
 ## Deployment
 - ``backend/Dockerfile`` — multi-stage (builder → slim runner, non-root user)
@@ -1419,7 +1598,7 @@ Do NOT leave any placeholders, TODOs, or "implement here" comments.
 - HTTP security headers (CSP, HSTS, X-Frame-Options, etc.)
 - Rate limiting, request size limits, parameterised queries only
 - Secrets in env vars, ``.env`` in ``.gitignore``
-{_QUALITY_FOOTER}"""
+""")
 
 
 def _master_prompt_mvp(
@@ -1428,23 +1607,28 @@ def _master_prompt_mvp(
     flags: Set[str],
     stack: StackChoice,
     domain: Optional[Dict] = None,
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
     """Generate a single lean prompt to build the entire MVP app."""
-    entities_section = _domain_entities_block(domain)
-    endpoints_section = _domain_endpoints_block(domain)
-    pages_section = _domain_pages_block(domain)
-    workflows_section = _domain_workflows_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities_section = blocks.entities
+    endpoints_section = blocks.endpoints
+    pages_section = blocks.pages
+    workflows_section = blocks.workflows
+
+    users_line = f"\n**Target Users:** {target_users}" if target_users else ""
 
-    return f"""You are a full-stack engineer. Build a **minimal working MVP** as fast as possible.
+    return _finalize(f"""You are a full-stack engineer. Build a **minimal working MVP** as fast as possible.
 Generate ALL code files — backend, frontend, database — in a single response.
 Keep it simple. No over-engineering. Ship fast.
 
 ## Idea
 {idea}
-{f"{chr(10)}**Target Users:** {target_users}" if target_users else ""}
+{users_line}
 
 ## Tech Stack
-{_stack_block(stack, ["frontend", "frontend_ui", "backend", "database", "auth"])}
+{_stack_block(stack, _SUBSET_MVP_MASTER)}
 {entities_section}
 {endpoints_section}
 {pages_section}
@@ -1498,13 +1682,28 @@ frontend/
 - Simple foreign keys (ON DELETE CASCADE)
 - Basic indexes on email and FKs
 
-{_MVP_QUALITY}"""
+""", _MVP_QUALITY)
 
 
 # ===================================================================
 # PUBLIC API
 # ===================================================================
 
+# Finished packs keyed by every input that shapes them; the domain dict is
+# frozen into nested tuples so it can take part in the key.
+_PROMPT_PACK_CACHE_MAX = 256
+_prompt_pack_cache = TTLCache(maxsize=_PROMPT_PACK_CACHE_MAX)
+
+
+def _freeze(value):
+    """Recursively convert dicts/lists from the domain JSON into hashable tuples."""
+    if isinstance(value, dict):
+        return dict, tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
 def build_prompt_pack(
     idea: str,
     flags: Set[str],
@@ -1523,27 +1722,71 @@ def build_prompt_pack(
     - mode="mvp": master prompt + 3 lean prompts
     - mode="production": master prompt + 9 core + conditional heavy prompts
     """
+    # Freeze the mutable inputs once; builders receive the frozen flags and
+    # the frozen domain doubles as the cache key.
+    flags = frozenset(flags)
+    key = (
+        idea, flags, stack, target_users, tuple(constraints or _EMPTY),
+        industry, mode, _freeze(domain), tool.slug if tool is not None else None,
+    )
+    cached = _prompt_pack_cache.get(key)
+    if cached is not None:
+        return dict(cached)
+    prompts = _build_prompt_pack(idea, flags, stack, target_users, constraints, industry, mode, domain, tool)
+    _prompt_pack_cache.put(key, dict(prompts))
+    return prompts
+
+
+def clear_prompt_pack_cache() -> None:
+    """Drop every cached prompt pack."""
+    _prompt_pack_cache.clear()
+
+
+_tool_prompts_module = None
+# slug -> build_*_prompts for tools whose pack is built entirely by tool_prompts;
+# filled on first use by _tool_prompts(). Claude Code composes with the default pack.
+_TOOL_DISPATCH: Dict[str, Callable[..., Dict[str, str]]] = {}
+
+
+def _tool_prompts():
+    """Import tool_prompts on first use — it imports this module, so not at top level."""
+    global _tool_prompts_module
+    if _tool_prompts_module is None:
+        from app.services import tool_prompts
+
+        _TOOL_DISPATCH.update(
+            lovable=tool_prompts.build_lovable_prompts,
+            replit=tool_prompts.build_replit_prompts,
+            base44=tool_prompts.build_base44_prompts,
+        )
+        _tool_prompts_module = tool_prompts
+    return _tool_prompts_module
+
+
+def _build_prompt_pack(
+    idea: str,
+    flags: Set[str],
+    stack: StackChoice,
+    target_users: Optional[str],
+    constraints: Optional[List[str]],
+    industry: Optional[str],
+    mode: str,
+    domain: Optional[Dict],
+    tool,
+) -> Dict[str, str]:
     # ── Tool-specific dispatch ──
     if tool is not None:
-        from app.services.tool_prompts import (
-            build_lovable_prompts,
-            build_replit_prompts,
-            build_base44_prompts,
-            build_claude_code_prompts,
-        )
-        slug = tool.slug
-        if slug == "lovable":
-            return build_lovable_prompts(idea, flags, stack, target_users, domain, mode)
-        elif slug == "replit":
-            return build_replit_prompts(idea, flags, stack, target_users, domain, mode)
-        elif slug == "base44":
-            return build_base44_prompts(idea, flags, stack, target_users, domain, mode)
-        elif slug == "claude_code":
+        tool_prompts = _tool_prompts()
+        builder = _TOOL_DISPATCH.get(tool.slug)
+        if builder is not None:
+            return builder(idea, flags, stack, target_users, domain, mode)
+        if tool.slug == "claude_code":
             # Claude Code uses the default prompts but with a custom master prompt
-            master = build_claude_code_prompts(
-                idea, flags, stack, target_users, constraints, industry, domain, mode,
+            blocks = _render_domain_blocks(domain)
+            master = tool_prompts.build_claude_code_prompts(
+                idea, flags, stack, target_users, constraints, industry, domain, mode, blocks,
             )
-            prompts = _build_default_prompts(idea, flags, stack, target_users, constraints, industry, mode, domain)
+            prompts = _build_default_prompts(idea, flags, stack, target_users, constraints, industry, mode, domain, blocks)
             prompts["master_prompt"] = master
             return prompts
 
@@ -1551,45 +1794,51 @@ def build_prompt_pack(
     return _build_default_prompts(idea, flags, stack, target_users, constraints, industry, mode, domain)
 
 
+# (flag, prompt key, builder) for the heavy prompts added only when a feature is detected.
+_CONDITIONAL_PROMPTS: Tuple[Tuple[str, str, Callable[[str, StackChoice, Optional[Dict]], str]], ...] = (
+    ("realtime", "realtime_implementation", _realtime_implementation),
+    ("payments", "payment_integration", _payment_integration),
+    ("ai", "ai_integration", _ai_integration),
+    ("mobile", "mobile_api", _mobile_api),
+    ("search", "search_implementation", _search_implementation),
+    ("file_upload", "file_upload_system", _file_upload_system),
+)
+
+
 def _build_default_prompts(
     idea: str, flags: Set[str], stack: StackChoice,
     target_users: Optional[str], constraints: Optional[List[str]],
     industry: Optional[str], mode: str, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
 ) -> Dict[str, str]:
     """Default prompt builder (no tool selected)."""
 
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+
     if mode == "mvp":
-        prompts: Dict[str, str] = {}
-        prompts["master_prompt"] = _master_prompt_mvp(idea, target_users, flags, stack, domain)
-        prompts["backend_code"] = _mvp_backend(idea, target_users, stack, domain)
-        prompts["frontend_code"] = _mvp_frontend(idea, target_users, stack, domain)
-        prompts["database_schema"] = _mvp_database(idea, stack, domain)
-        return prompts
+        return {
+            "master_prompt": _master_prompt_mvp(idea, target_users, flags, stack, domain, blocks),
+            "backend_code": _mvp_backend(idea, target_users, stack, domain, blocks),
+            "frontend_code": _mvp_frontend(idea, target_users, stack, domain, blocks),
+            "database_schema": _mvp_database(idea, stack, domain, blocks),
+        }
 
     # ── Production mode ──
-    prompts: Dict[str, str] = {}
-    prompts["master_prompt"] = _master_prompt_production(idea, target_users, flags, stack, industry, domain)
-    prompts["product_requirements"] = _product_requirements(idea, target_users, stack, domain)
-    prompts["backend_code"] = _backend_code(idea, target_users, flags, stack, domain)
-    prompts["frontend_code"] = _frontend_code(idea, target_users, flags, stack, domain)
-    prompts["database_schema"] = _database_schema(idea, flags, stack, domain)
-    prompts["auth_setup"] = _auth_setup(idea, flags, stack, domain)
-    prompts["api_documentation"] = _api_documentation(idea, flags, stack, domain)
-    prompts["deployment_config"] = _deployment_config(idea, flags, stack, domain)
-    prompts["testing_suite"] = _testing_suite(idea, flags, stack, domain)
-    prompts["security_checklist"] = _security_checklist(idea, flags, stack, industry, domain)
-
-    if "realtime" in flags:
-        prompts["realtime_implementation"] = _realtime_implementation(idea, stack, domain)
-    if "payments" in flags:
-        prompts["payment_integration"] = _payment_integration(idea, stack, domain)
-    if "ai" in flags:
-        prompts["ai_integration"] = _ai_integration(idea, stack, domain)
-    if "mobile" in flags:
-        prompts["mobile_api"] = _mobile_api(idea, stack, domain)
-    if "search" in flags:
-        prompts["search_implementation"] = _search_implementation(idea, stack, domain)
-    if "file_upload" in flags:
-        prompts["file_upload_system"] = _file_upload_system(idea, stack, domain)
+    prompts: Dict[str, str] = {
+        "master_prompt": _master_prompt_production(idea, target_users, flags, stack, industry, domain, blocks),
+        "product_requirements": _product_requirements(idea, target_users, stack, domain, blocks),
+        "backend_code": _backend_code(idea, target_users, flags, stack, domain, blocks),
+        "frontend_code": _frontend_code(idea, target_users, flags, stack, domain, blocks),
+        "database_schema": _database_schema(idea, flags, stack, domain, blocks),
+        "auth_setup": _auth_setup(idea, flags, stack, domain),
+        "api_documentation": _api_documentation(idea, flags, stack, domain, blocks),
+        "deployment_config": _deployment_config(idea, flags, stack, domain),
+        "testing_suite": _testing_suite(idea, flags, stack, domain),
+        "security_checklist": _security_checklist(idea, flags, stack, industry, domain),
+    }
+    for flag, key, builder in _CONDITIONAL_PROMPTS:
+        if flag in flags:
+            prompts[key] = builder(idea, stack, domain)
 
     return prompts
@@ -1,10 +1,12 @@
 """Tech-stack selection driven by detected feature flags."""
 
-from dataclasses import dataclass, asdict
-from typing import Dict, Set
+from dataclasses import dataclass, fields
+from functools import lru_cache
+from operator import attrgetter
+from typing import Dict, FrozenSet, Set
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StackChoice:
     frontend: str
     frontend_ui: str
@@ -21,11 +23,22 @@ class StackChoice:
     testing: str
 
     def to_dict(self) -> Dict[str, str]:
-        return asdict(self)
+        # Flat str fields: skip asdict()'s recursive deepcopy.
+        return dict(zip(_STACK_FIELDS, _get_stack_fields(self)))
+
+
+_STACK_FIELDS = tuple(f.name for f in fields(StackChoice))
+_get_stack_fields = attrgetter(*_STACK_FIELDS)
 
 
 def choose_stack(flags: Set[str]) -> StackChoice:
     """Return a fully-populated StackChoice based on *flags*."""
+    return _choose_stack(frozenset(flags))
+
+
+@lru_cache(maxsize=256)
+def _choose_stack(flags: FrozenSet[str]) -> StackChoice:
+    """Cached body of ``choose_stack`` — StackChoice is frozen, so sharing it is safe."""
 
     # --- Frontend ---
     frontend = "Next.js 14 (App Router) + Tailwind CSS 3"
@@ -1,72 +1,110 @@
 import logging
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
 
-import stripe
-
+from app.core.cache import TTLCache
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
-_stripe_ready = False
+_stripe = None  # configured stripe module, set once by _ensure_stripe
+_stripe_lock = threading.Lock()
+
+# user_id -> stripe_customer_id
+_CUSTOMER_CACHE_TTL = 3600
+_CUSTOMER_CACHE_MAX = 10_000
+_customer_cache = TTLCache(maxsize=_CUSTOMER_CACHE_MAX, ttl=_CUSTOMER_CACHE_TTL)
 
 
 def _ensure_stripe():
-    """Lazy-init Stripe — only runs when a Stripe endpoint is actually called."""
-    global _stripe_ready
-    if _stripe_ready:
-        return
-    if not settings.stripe_secret_key:
-        raise RuntimeError("Stripe is not configured (STRIPE_SECRET_KEY missing)")
-    stripe.api_key = settings.stripe_secret_key
-    _stripe_ready = True
+    """Lazy-import and init Stripe — only runs when a Stripe endpoint is actually called."""
+    global _stripe
+    if _stripe is not None:
+        return _stripe
+    with _stripe_lock:
+        # Another thread may have finished the import while we waited.
+        if _stripe is None:
+            if not settings.stripe_secret_key:
+                raise RuntimeError("Stripe is not configured (STRIPE_SECRET_KEY missing)")
+            import stripe
+
+            stripe.api_key = settings.stripe_secret_key
+            _stripe = stripe
+    return _stripe
+
+
+def _tier_price_map() -> Dict[str, str]:
+    """Tier name -> Stripe price ID, read from settings on each access."""
+    return {
+        "pro": settings.stripe_pro_price_id,
+        "enterprise": settings.stripe_enterprise_price_id,
+    }
+
+
+@lru_cache(maxsize=1)
+def _price_map() -> Dict[str, str]:
+    """Stripe price ID -> tier name. Call ``_price_map.cache_clear()`` if settings change."""
+    return {price_id: tier for tier, price_id in _tier_price_map().items()}
 
 
 def get_tier_from_price(price_id: str) -> str:
     """Map a Stripe price ID to a tier name."""
-    price_map = {
-        settings.stripe_pro_price_id: "pro",
-        settings.stripe_enterprise_price_id: "enterprise",
-    }
-    return price_map.get(price_id, "pro")
+    return _price_map().get(price_id, "pro")
 
 
-# Backward-compatible constant — built lazily on first use
-TIER_PRICE_MAP: dict = {}
+def __getattr__(name: str):
+    # Backward-compatible TIER_PRICE_MAP, built on access instead of at import
+    if name == "TIER_PRICE_MAP":
+        return _tier_price_map()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-def create_checkout_session(
-    user_id: str,
-    email: str,
-    price_id: str,
-    success_url: str,
-    cancel_url: str,
-) -> str:
-    """Create a Stripe Checkout session and return the URL."""
-    _ensure_stripe()
-    from app.core.supabase_client import get_supabase
+def remember_customer(user_id: str, customer_id: str) -> None:
+    """Cache a user's Stripe customer ID."""
+    _customer_cache.put(user_id, customer_id)
+
 
-    sb = get_supabase()
+def get_customer_id(user_id: str) -> Optional[str]:
+    """Return the user's Stripe customer ID, reading Supabase only on a cache miss."""
+    customer_id = _customer_cache.get(user_id)
+    if customer_id:
+        return customer_id
+
+    from app.core.supabase_client import get_supabase
 
     profile = (
-        sb.table("profiles")
+        get_supabase()
+        .table("profiles")
         .select("stripe_customer_id")
         .eq("id", user_id)
         .single()
         .execute()
     )
     customer_id = profile.data.get("stripe_customer_id") if profile.data else None
+    if customer_id:
+        remember_customer(user_id, customer_id)
+    return customer_id
 
-    if not customer_id:
-        customer = stripe.Customer.create(
-            email=email,
-            metadata={"supabase_user_id": user_id},
-        )
-        customer_id = customer.id
-        sb.table("profiles").update(
-            {"stripe_customer_id": customer_id}
-        ).eq("id", user_id).execute()
 
+def create_checkout_session(
+    user_id: str,
+    email: str,
+    price_id: str,
+    success_url: str,
+    cancel_url: str,
+) -> str:
+    """Create a Stripe Checkout session and return the URL."""
+    stripe = _ensure_stripe()
+    customer_id = get_customer_id(user_id)
+
+    # First-time buyers: let Checkout create the customer instead of a separate
+    # Customer.create call; the webhook stores the new ID on completion.
+    customer_args = (
+        {"customer": customer_id} if customer_id else {"customer_email": email}
+    )
     session = stripe.checkout.Session.create(
-        customer=customer_id,
+        **customer_args,
         mode="subscription",
         line_items=[{"price": price_id, "quantity": 1}],
         success_url=success_url,
@@ -78,7 +116,7 @@ def create_checkout_session(
 
 def create_portal_session(customer_id: str, return_url: str) -> str:
     """Create a Stripe billing portal session."""
-    _ensure_stripe()
+    stripe = _ensure_stripe()
     session = stripe.billing_portal.Session.create(
         customer=customer_id,
         return_url=return_url,
@@ -88,10 +126,16 @@ def create_portal_session(customer_id: str, return_url: str) -> str:
 
 def handle_webhook_event(payload: bytes, sig_header: str):
     """Verify and parse a Stripe webhook event."""
-    _ensure_stripe()
+    stripe = _ensure_stripe()
     if not settings.stripe_webhook_secret:
         raise RuntimeError("Stripe webhook secret not configured")
     event = stripe.Webhook.construct_event(
         payload, sig_header, settings.stripe_webhook_secret
     )
     return event
+
+
+def retrieve_subscription(subscription_id: str):
+    """Fetch a Stripe subscription by ID."""
+    stripe = _ensure_stripe()
+    return stripe.Subscription.retrieve(subscription_id)
@@ -6,12 +6,55 @@ prompts are built procedurally in ``prompt_templates.py`` — this module only
 handles the LLM conversation.
 """
 
-from typing import List, Optional, Set
+import re
+from dataclasses import fields
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
 
 from app.api.schemas import IdeaRequest
 from app.services.feature_detection import FEATURE_DESCRIPTIONS
 from app.services.stack_selection import StackChoice
 
+# "file_storage" -> "File Storage", computed once per StackChoice field.
+_STACK_KEY_LABELS: Dict[str, str] = {
+    f.name: f.name.replace("_", " ").title() for f in fields(StackChoice)
+}
+
+# Budget keywords for scope guidance (plain substrings, case-insensitive).
+_LOW_BUDGET_RE = re.compile(r"small|low|minimal|bootstrap|< ?5k", re.IGNORECASE)
+_HIGH_BUDGET_RE = re.compile(r"large|high|enterprise|> ?50k", re.IGNORECASE)
+
+
+@lru_cache(maxsize=512)
+def _stack_lines(stack: StackChoice, bullet: str) -> str:
+    """Render the chosen stack (skipping "None" entries) as *bullet*-prefixed lines."""
+    return "\n".join(
+        f"{bullet}{_STACK_KEY_LABELS[k]}: {v}"
+        for k, v in stack.to_dict().items()
+        if v != "None"
+    )
+
+
+@lru_cache(maxsize=512)
+def _feature_lines(flags: FrozenSet[str], line_format: str) -> str:
+    """Render the detected features, sorted, with *line_format* (``{flag}``, ``{desc}``)."""
+    return "\n".join(
+        line_format.format(flag=f, desc=FEATURE_DESCRIPTIONS.get(f, f))
+        for f in sorted(flags)
+    )
+
+
+class _UserPromptInputs(NamedTuple):
+    """The ``IdeaRequest`` fields the user prompt reads, in hashable form."""
+
+    idea: str
+    target_users: Optional[str]
+    budget: Optional[str]
+    timeline: Optional[str]
+    constraints: Tuple[str, ...]
+    industry: Optional[str]
+    preferred_stack: Optional[str]
+
 
 def _mvp_system_prompt() -> str:
     return (
@@ -25,7 +68,7 @@ def _mvp_system_prompt() -> str:
     )
 
 
-def _mvp_user_prompt(req: "IdeaRequest") -> str:
+def _mvp_user_prompt(req: _UserPromptInputs) -> str:
     parts = [f"## Idea\n{req.idea}"]
     if req.target_users:
         parts.append(f"## Target Users\n{req.target_users}")
@@ -40,21 +83,19 @@ def _mvp_user_prompt(req: "IdeaRequest") -> str:
 
 def build_system_prompt(flags: Set[str], stack: StackChoice, mode: str = "production") -> str:
     """Construct the system prompt for the LLM."""
+    return _build_system_prompt(frozenset(flags), stack, mode)
+
+
+@lru_cache(maxsize=256)
+def _build_system_prompt(flags: FrozenSet[str], stack: StackChoice, mode: str) -> str:
     if mode == "mvp":
         return _mvp_system_prompt()
 
-    stack_lines = "\n".join(
-        f"  - {k.replace('_', ' ').title()}: {v}"
-        for k, v in stack.to_dict().items()
-        if v != "None"
-    )
+    stack_lines = _stack_lines(stack, "  - ")
 
     feature_lines = ""
     if flags:
-        feature_lines = "\n".join(
-            f"  - {f}: {FEATURE_DESCRIPTIONS.get(f, f)}"
-            for f in sorted(flags)
-        )
+        feature_lines = _feature_lines(flags, "  - {flag}: {desc}")
         feature_lines = f"""
 The following feature capabilities were detected in the idea:
 {feature_lines}
@@ -120,6 +161,20 @@ def build_user_prompt(
     mode: str = "production",
 ) -> str:
     """Construct the user prompt for the LLM."""
+    inputs = _UserPromptInputs(
+        req.idea, req.target_users, req.budget, req.timeline,
+        tuple(req.constraints or ()), req.industry, req.preferred_stack,
+    )
+    return _build_user_prompt(inputs, frozenset(flags), stack, mode)
+
+
+@lru_cache(maxsize=256)
+def _build_user_prompt(
+    req: _UserPromptInputs,
+    flags: FrozenSet[str],
+    stack: StackChoice,
+    mode: str,
+) -> str:
     if mode == "mvp":
         return _mvp_user_prompt(req)
 
@@ -159,29 +214,21 @@ def build_user_prompt(
 
     # Detected features
     if flags:
-        feature_list = "\n".join(
-            f"- **{f}**: {FEATURE_DESCRIPTIONS.get(f, f)}"
-            for f in sorted(flags)
-        )
+        feature_list = _feature_lines(flags, "- **{flag}**: {desc}")
         sections.append(f"## Detected Features\n{feature_list}")
 
     # Stack summary
-    stack_summary = "\n".join(
-        f"- {k.replace('_', ' ').title()}: {v}"
-        for k, v in stack.to_dict().items()
-        if v != "None"
-    )
+    stack_summary = _stack_lines(stack, "- ")
     sections.append(f"## Selected Tech Stack\n{stack_summary}")
 
     # Scope guidance
     if req.budget:
-        budget_lower = req.budget.lower()
-        if any(w in budget_lower for w in ["small", "low", "minimal", "bootstrap", "< 5k", "<5k"]):
+        if _LOW_BUDGET_RE.search(req.budget):
             sections.append(
                 "## Scope Guidance\nBudget is limited — focus on a lean MVP. "
                 "Minimise paid services, prefer open-source alternatives, and defer non-essential features."
             )
-        elif any(w in budget_lower for w in ["large", "high", "enterprise", "> 50k", ">50k"]):
+        elif _HIGH_BUDGET_RE.search(req.budget):
             sections.append(
                 "## Scope Guidance\nBudget is substantial — plan for production-grade infrastructure, "
                 "comprehensive monitoring, and polished UX from day one."
@@ -5,17 +5,18 @@ for a specific AI coding tool (Lovable, Replit, Base44, Claude Code).
 """
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional
+from types import MappingProxyType
+from typing import List, Mapping, Optional
 
 from app.services.stack_selection import StackChoice
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class ToolProfile:
     slug: str
     name: str
     description: str
-    stack: StackChoice
+    stack: Optional[StackChoice]
     prompt_style: str          # "descriptive", "conversational", "entity_focused", "detailed_code"
     has_own_deployment: bool
     has_own_auth: bool
@@ -108,16 +109,15 @@ _CLAUDE_CODE = ToolProfile(
 )
 
 
-TOOL_PROFILES: Dict[str, ToolProfile] = {
+# Read-only view: the registry is shared process-wide and must not be mutated.
+TOOL_PROFILES: Mapping[str, ToolProfile] = MappingProxyType({
     "lovable": _LOVABLE,
     "replit": _REPLIT,
     "base44": _BASE44,
     "claude_code": _CLAUDE_CODE,
-}
+})
 
 
 def get_tool_profile(slug: Optional[str]) -> Optional[ToolProfile]:
     """Return the tool profile for *slug*, or None for default behavior."""
-    if not slug:
-        return None
-    return TOOL_PROFILES.get(slug)
+    return TOOL_PROFILES.get(slug) if slug else None
@@ -5,16 +5,15 @@ master prompt and set of individual prompts tailored to the tool's stack,
 conventions, and prompt style.
 """
 
-from typing import Dict, List, Optional, Set
+import string
+from typing import Dict, List, Optional, Set, Tuple
 
 from app.services.stack_selection import StackChoice
 from app.services.prompt_templates import (
+    _DomainBlocks,
+    _finalize,
+    _render_domain_blocks,
     _stack_block,
-    _domain_entities_block,
-    _domain_endpoints_block,
-    _domain_pages_block,
-    _domain_workflows_block,
-    _QUALITY_FOOTER,
 )
 
 
@@ -22,45 +21,29 @@ from app.services.prompt_templates import (
 # LOVABLE — React + Vite + Supabase
 # ===================================================================
 
-def _lovable_master(
-    idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, domain: Optional[Dict], mode: str,
-) -> str:
-    entities = _domain_entities_block(domain)
-    endpoints = _domain_endpoints_block(domain)
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
-
-    feature_notes = ""
-    if "realtime" in flags:
-        feature_notes += "\n- Enable Supabase Realtime on relevant tables for live updates."
-    if "payments" in flags:
-        feature_notes += "\n- Integrate Stripe via Supabase Edge Function (webhook handler + checkout session)."
-    if "ai" in flags:
-        feature_notes += "\n- Call OpenAI API from a Supabase Edge Function; stream responses via SSE."
-    if "file_upload" in flags:
-        feature_notes += "\n- Use Supabase Storage for file uploads with RLS policies on buckets."
-    if "search" in flags:
-        feature_notes += "\n- Use PostgreSQL full-text search (tsvector) for search functionality."
-
-    lean = mode == "mvp"
-    scope = "MVP" if lean else "production-ready"
+_LOVABLE_FEATURE_NOTES: Dict[str, str] = {
+    "realtime": "\n- Enable Supabase Realtime on relevant tables for live updates.",
+    "payments": "\n- Integrate Stripe via Supabase Edge Function (webhook handler + checkout session).",
+    "ai": "\n- Call OpenAI API from a Supabase Edge Function; stream responses via SSE.",
+    "file_upload": "\n- Use Supabase Storage for file uploads with RLS policies on buckets.",
+    "search": "\n- Use PostgreSQL full-text search (tsvector) for search functionality.",
+}
 
-    return f"""Build a **complete, {scope}** web application using **Lovable** (lovable.dev).
+_LOVABLE_MASTER_TEMPLATE = string.Template("""Build a **complete, ${scope}** web application using **Lovable** (lovable.dev).
 Lovable generates React + Vite + Tailwind CSS apps with Supabase as the backend.
 Describe EVERYTHING the app needs so Lovable can build it in one shot.
 
 ## Project Description
-{idea}
-{f"**Target Users:** {target_users}" if target_users else ""}
+${idea}
+${target_users_line}
 
 ## Tech Stack (Lovable's stack)
 - **Frontend:** React 18 + Vite 5 + Tailwind CSS 3 + shadcn/ui
 - **Backend:** Supabase (PostgreSQL database, Auth, Edge Functions, Storage, Realtime)
 - **Hosting:** Lovable auto-deploy
-{entities}
-{pages}
-{workflows}
+${entities}
+${pages}
+${workflows}
 
 ## Supabase Database Design
 Define ALL tables the app needs. For each table:
@@ -68,7 +51,7 @@ Define ALL tables the app needs. For each table:
 - Primary keys, foreign keys, and relationships
 - Row-Level Security (RLS) policies: who can SELECT, INSERT, UPDATE, DELETE
 - Enable Realtime on tables that need live updates
-{endpoints if not lean else ""}
+${endpoints}
 
 ## Authentication
 - Use Supabase Auth with email/password sign-up
@@ -76,13 +59,13 @@ Define ALL tables the app needs. For each table:
 - Auth state managed via Supabase client `onAuthStateChange`
 
 ## Frontend Pages & Components
-{"Build all pages listed above." if pages else "Build pages for every core workflow."}
+${pages_line}
 Each page needs:
 - Loading states, error handling, empty states
 - Responsive design (mobile-first)
 - Forms with validation using react-hook-form + zod
 - Toast notifications for success/error feedback
-{f"## Feature-Specific Requirements{feature_notes}" if feature_notes else ""}
+${feature_section}
 
 ## Important Lovable Conventions
 - Do NOT generate a separate backend server — Supabase handles all backend logic
@@ -90,30 +73,52 @@ Each page needs:
 - For custom server-side logic, use Supabase Edge Functions (Deno/TypeScript)
 - All database access must go through RLS policies — never disable RLS
 - Use Supabase Storage for file handling, not external S3
-{"- Keep it lean — only essential features for MVP" if lean else "- Build for production: proper error handling, loading states, and edge cases"}"""
+${scope_line}""")
 
 
-def _lovable_frontend(
+def _lovable_master(
     idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, domain: Optional[Dict],
+    stack: StackChoice, domain: Optional[Dict], mode: str,
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    pages = blocks.pages
 
-    return f"""You are building the React frontend for a Lovable app.
+    feature_notes = "".join(note for flag, note in _LOVABLE_FEATURE_NOTES.items() if flag in flags)
+
+    lean = mode == "mvp"
+    return _LOVABLE_MASTER_TEMPLATE.substitute(
+        scope="MVP" if lean else "production-ready",
+        idea=idea,
+        target_users_line=f"**Target Users:** {target_users}" if target_users else "",
+        entities=blocks.entities,
+        pages=pages,
+        workflows=blocks.workflows,
+        endpoints=blocks.endpoints if not lean else "",
+        pages_line="Build all pages listed above." if pages else "Build pages for every core workflow.",
+        feature_section=f"## Feature-Specific Requirements{feature_notes}" if feature_notes else "",
+        scope_line=(
+            "- Keep it lean — only essential features for MVP" if lean
+            else "- Build for production: proper error handling, loading states, and edge cases"
+        ),
+    )
+
+
+_LOVABLE_FRONTEND_TEMPLATE = string.Template("""You are building the React frontend for a Lovable app.
 Describe the **complete component and page structure**.
 
 ## App Idea
-{idea}
-{f"Target Users: {target_users}" if target_users else ""}
+${idea}
+${target_users_line}
 
 ## Tech Stack
 - React 18 + Vite 5 + Tailwind CSS 3 + shadcn/ui
 - Supabase client for data fetching and auth
 - react-hook-form + zod for forms
 - React Router for navigation
-{pages}
-{workflows}
+${pages}
+${workflows}
 
 ## Page Structure
 For each page, describe:
@@ -138,20 +143,31 @@ For each page, describe:
 - Use `.insert()`, `.update()`, `.delete()` for writes
 - Subscribe to Realtime changes where needed
 - Handle optimistic updates for better UX
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _lovable_database(
-    idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict],
+def _lovable_frontend(
+    idea: str, target_users: Optional[str], flags: Set[str],
+    stack: StackChoice, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    entities = _domain_entities_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
 
-    return f"""You are designing the Supabase PostgreSQL database for a Lovable app.
+    return _finalize(_LOVABLE_FRONTEND_TEMPLATE.substitute(
+        idea=idea,
+        target_users_line=f"Target Users: {target_users}" if target_users else "",
+        pages=blocks.pages,
+        workflows=blocks.workflows,
+    ))
+
+
+_LOVABLE_DATABASE_TEMPLATE = string.Template("""You are designing the Supabase PostgreSQL database for a Lovable app.
 Produce **COMPLETE SQL** for all tables, RLS policies, and triggers.
 
 ## App Idea
-{idea}
-{entities}
+${idea}
+${entities}
 
 ## Requirements
 
@@ -178,17 +194,28 @@ Produce **COMPLETE SQL** for all tables, RLS policies, and triggers.
      `ALTER PUBLICATION supabase_realtime ADD TABLE ...;`
 
 Output complete SQL that can be pasted into the Supabase SQL Editor.
-{_QUALITY_FOOTER}"""
+""")
+
+
+def _lovable_database(
+    idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
+) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+
+    return _finalize(_LOVABLE_DATABASE_TEMPLATE.substitute(idea=idea, entities=blocks.entities))
 
 
 def build_lovable_prompts(
     idea: str, flags: Set[str], stack: StackChoice,
     target_users: Optional[str], domain: Optional[Dict], mode: str,
 ) -> Dict[str, str]:
+    blocks = _render_domain_blocks(domain)
     prompts: Dict[str, str] = {}
-    prompts["master_prompt"] = _lovable_master(idea, target_users, flags, stack, domain, mode)
-    prompts["frontend_code"] = _lovable_frontend(idea, target_users, flags, stack, domain)
-    prompts["database_schema"] = _lovable_database(idea, flags, stack, domain)
+    prompts["master_prompt"] = _lovable_master(idea, target_users, flags, stack, domain, mode, blocks)
+    prompts["frontend_code"] = _lovable_frontend(idea, target_users, flags, stack, domain, blocks)
+    prompts["database_schema"] = _lovable_database(idea, flags, stack, domain, blocks)
     return prompts
 
 
@@ -196,34 +223,20 @@ def build_lovable_prompts(
 # REPLIT AGENT — React + Node.js/Express + PostgreSQL
 # ===================================================================
 
-def _replit_master(
-    idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, domain: Optional[Dict], mode: str,
-) -> str:
-    entities = _domain_entities_block(domain)
-    endpoints = _domain_endpoints_block(domain)
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
-
-    feature_notes = ""
-    if "realtime" in flags:
-        feature_notes += "\n- Use Socket.io for real-time features (Express + React)."
-    if "payments" in flags:
-        feature_notes += "\n- Integrate Stripe: checkout sessions, webhook handler, billing portal."
-    if "ai" in flags:
-        feature_notes += "\n- Use OpenAI npm package for AI features; stream responses via SSE."
-    if "file_upload" in flags:
-        feature_notes += "\n- Use multer for file uploads; store in Replit Object Storage."
+_REPLIT_FEATURE_NOTES: Dict[str, str] = {
+    "realtime": "\n- Use Socket.io for real-time features (Express + React).",
+    "payments": "\n- Integrate Stripe: checkout sessions, webhook handler, billing portal.",
+    "ai": "\n- Use OpenAI npm package for AI features; stream responses via SSE.",
+    "file_upload": "\n- Use multer for file uploads; store in Replit Object Storage.",
+}
 
-    lean = mode == "mvp"
-    scope = "MVP" if lean else "production-ready"
 
-    return f"""Build a **complete, {scope}** full-stack web application using **Replit Agent**.
+_REPLIT_MASTER_TEMPLATE = string.Template("""Build a **complete, ${scope}** full-stack web application using **Replit Agent**.
 Replit uses React for the frontend and Node.js + Express for the backend with PostgreSQL.
 
 ## Project Description
-{idea}
-{f"**Target Users:** {target_users}" if target_users else ""}
+${idea}
+${target_users_line}
 
 ## Tech Stack (Replit's stack)
 - **Frontend:** React 18 + Vite + Tailwind CSS 3 + shadcn/ui
@@ -231,10 +244,10 @@ Replit uses React for the frontend and Node.js + Express for the backend with Po
 - **Database:** PostgreSQL 16 + Prisma ORM
 - **Auth:** Express sessions + bcrypt + JWT
 - **Hosting:** Replit Deployments (auto-hosted)
-{entities}
-{endpoints}
-{pages}
-{workflows}
+${entities}
+${endpoints}
+${pages}
+${workflows}
 
 ## Backend Structure
 ```
@@ -274,7 +287,7 @@ client/
 - Use UUID primary keys
 - Run `prisma migrate dev` for migrations
 - Seed script for development data
-{f"## Feature-Specific{feature_notes}" if feature_notes else ""}
+${feature_section}
 
 ## Replit Conventions
 - Keep file structure flat and simple
@@ -282,30 +295,53 @@ client/
 - Do NOT create Docker files or CI/CD pipelines — Replit handles deployment
 - Use environment variables via Replit Secrets (not .env files in production)
 - The app should work on port 3000 (Replit's default)
-{"- MVP only — skip tests, monitoring, and advanced features" if lean else ""}
-{_QUALITY_FOOTER}"""
+${scope_line}
+""")
 
 
-def _replit_backend(
+def _replit_master(
     idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, domain: Optional[Dict],
+    stack: StackChoice, domain: Optional[Dict], mode: str,
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    entities = _domain_entities_block(domain)
-    endpoints = _domain_endpoints_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
+    endpoints = blocks.endpoints
+    pages = blocks.pages
+    workflows = blocks.workflows
+
+    feature_notes = "".join(note for flag, note in _REPLIT_FEATURE_NOTES.items() if flag in flags)
+
+    lean = mode == "mvp"
+    scope = "MVP" if lean else "production-ready"
+
+    return _finalize(_REPLIT_MASTER_TEMPLATE.substitute(
+        scope=scope,
+        idea=idea,
+        target_users_line=f"**Target Users:** {target_users}" if target_users else "",
+        entities=entities,
+        endpoints=endpoints,
+        pages=pages,
+        workflows=workflows,
+        feature_section=f"## Feature-Specific{feature_notes}" if feature_notes else "",
+        scope_line="- MVP only — skip tests, monitoring, and advanced features" if lean else "",
+    ))
+
 
-    return f"""You are a Node.js backend engineer. Build a **COMPLETE Express backend** for Replit.
+_REPLIT_BACKEND_TEMPLATE = string.Template("""You are a Node.js backend engineer. Build a **COMPLETE Express backend** for Replit.
 
 ## App Idea
-{idea}
-{f"Target Users: {target_users}" if target_users else ""}
+${idea}
+${target_users_line}
 
 ## Tech Stack
 - Node.js 20 + Express 4
 - PostgreSQL + Prisma ORM
 - bcrypt for password hashing
 - jsonwebtoken for JWT
-{entities}
-{endpoints}
+${entities}
+${endpoints}
 
 ## File Structure (flat, Replit-friendly)
 ```
@@ -325,26 +361,38 @@ server/
 - Input validation using express-validator or zod
 - Error handling middleware (return JSON errors, never stack traces)
 - Pagination: `?page=1&limit=20`
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _replit_frontend(
+def _replit_backend(
     idea: str, target_users: Optional[str], flags: Set[str],
     stack: StackChoice, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    pages = _domain_pages_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
+    endpoints = blocks.endpoints
+
+    return _finalize(_REPLIT_BACKEND_TEMPLATE.substitute(
+        idea=idea,
+        target_users_line=f"Target Users: {target_users}" if target_users else "",
+        entities=entities,
+        endpoints=endpoints,
+    ))
+
 
-    return f"""You are a React frontend engineer. Build a **COMPLETE frontend** for a Replit app.
+_REPLIT_FRONTEND_TEMPLATE = string.Template("""You are a React frontend engineer. Build a **COMPLETE frontend** for a Replit app.
 
 ## App Idea
-{idea}
-{f"Target Users: {target_users}" if target_users else ""}
+${idea}
+${target_users_line}
 
 ## Tech Stack
 - React 18 + Vite + Tailwind CSS 3 + shadcn/ui
 - react-hook-form + zod for forms
 - Fetch API with auth wrapper
-{pages}
+${pages}
 
 ## File Structure
 ```
@@ -370,19 +418,30 @@ client/src/
 - Loading spinners, error states, empty states
 - Mobile-responsive with Tailwind
 - Toast notifications for actions
-{_QUALITY_FOOTER}"""
+""")
 
 
-def _replit_database(
-    idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict],
+def _replit_frontend(
+    idea: str, target_users: Optional[str], flags: Set[str],
+    stack: StackChoice, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    entities = _domain_entities_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    pages = blocks.pages
+
+    return _finalize(_REPLIT_FRONTEND_TEMPLATE.substitute(
+        idea=idea,
+        target_users_line=f"Target Users: {target_users}" if target_users else "",
+        pages=pages,
+    ))
 
-    return f"""You are a database engineer. Design a **Prisma schema** for a Replit app.
+
+_REPLIT_DATABASE_TEMPLATE = string.Template("""You are a database engineer. Design a **Prisma schema** for a Replit app.
 
 ## App Idea
-{idea}
-{entities}
+${idea}
+${entities}
 
 ## Requirements
 - Use Prisma ORM with PostgreSQL
@@ -392,18 +451,30 @@ def _replit_database(
 - Define all relations with `@relation`
 - Add `@@index` for query-optimized fields
 - Include a seed script (`server/seed.js`) with sample data
-{_QUALITY_FOOTER}"""
+""")
+
+
+def _replit_database(
+    idea: str, flags: Set[str], stack: StackChoice, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
+) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
+
+    return _finalize(_REPLIT_DATABASE_TEMPLATE.substitute(idea=idea, entities=entities))
 
 
 def build_replit_prompts(
     idea: str, flags: Set[str], stack: StackChoice,
     target_users: Optional[str], domain: Optional[Dict], mode: str,
 ) -> Dict[str, str]:
+    blocks = _render_domain_blocks(domain)
     prompts: Dict[str, str] = {}
-    prompts["master_prompt"] = _replit_master(idea, target_users, flags, stack, domain, mode)
-    prompts["backend_code"] = _replit_backend(idea, target_users, flags, stack, domain)
-    prompts["frontend_code"] = _replit_frontend(idea, target_users, flags, stack, domain)
-    prompts["database_schema"] = _replit_database(idea, flags, stack, domain)
+    prompts["master_prompt"] = _replit_master(idea, target_users, flags, stack, domain, mode, blocks)
+    prompts["backend_code"] = _replit_backend(idea, target_users, flags, stack, domain, blocks)
+    prompts["frontend_code"] = _replit_frontend(idea, target_users, flags, stack, domain, blocks)
+    prompts["database_schema"] = _replit_database(idea, flags, stack, domain, blocks)
     return prompts
 
 
@@ -411,34 +482,23 @@ def build_replit_prompts(
 # BASE44 — No-code data-first platform
 # ===================================================================
 
-def _base44_master(
-    idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, domain: Optional[Dict], mode: str,
-) -> str:
-    entities = _domain_entities_block(domain)
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
-
-    integrations = ""
-    if "payments" in flags:
-        integrations += "\n- **Stripe**: Connect for payment processing, subscriptions, invoicing."
-    if "ai" in flags:
-        integrations += "\n- **OpenAI**: Connect for AI-powered features (text generation, analysis)."
-    if "notifications" in flags or "email" in flags:
-        integrations += "\n- **SendGrid/Resend**: Connect for transactional emails and notifications."
+_BASE44_INTEGRATIONS: Tuple[Tuple[Tuple[str, ...], str], ...] = (
+    (("payments",), "\n- **Stripe**: Connect for payment processing, subscriptions, invoicing."),
+    (("ai",), "\n- **OpenAI**: Connect for AI-powered features (text generation, analysis)."),
+    (("notifications", "email"), "\n- **SendGrid/Resend**: Connect for transactional emails and notifications."),
+)
 
-    lean = mode == "mvp"
 
-    return f"""Build a **complete application** using **Base44** (base44.com).
+_BASE44_MASTER_TEMPLATE = string.Template("""Build a **complete application** using **Base44** (base44.com).
 Base44 is a data-first AI app builder — you define entities and pages, and it generates everything.
 Do NOT write code. Instead, describe the data model, pages, and workflows.
 
 ## Project Description
-{idea}
-{f"**Target Users:** {target_users}" if target_users else ""}
-{entities}
-{pages}
-{workflows}
+${idea}
+${target_users_line}
+${entities}
+${pages}
+${workflows}
 
 ## Entity Definitions (Base44 format)
 For each entity, define:
@@ -462,7 +522,7 @@ Define automation rules:
 - **Trigger**: on entity create, update, delete, or scheduled
 - **Condition**: field equals, contains, greater than, etc.
 - **Action**: send email, update field, create related record, call webhook
-{f"## Integrations{integrations}" if integrations else ""}
+${integrations_section}
 
 ## Authentication & Roles
 - Define user roles (e.g., Admin, Member, Viewer)
@@ -475,19 +535,43 @@ Define automation rules:
 - Use Relations to link entities (not foreign key fields)
 - Use Select/MultiSelect for enum-like fields (e.g., status, priority)
 - Use the Workflow builder for business logic, not code
-{"- MVP: only include essential entities and pages" if lean else "- Include all entities, pages, and workflows for a complete app"}"""
+${scope_line}""")
 
 
-def _base44_entities(
-    idea: str, flags: Set[str], domain: Optional[Dict],
+def _base44_master(
+    idea: str, target_users: Optional[str], flags: Set[str],
+    stack: StackChoice, domain: Optional[Dict], mode: str,
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    entities = _domain_entities_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
+    pages = blocks.pages
+    workflows = blocks.workflows
+
+    integrations = "".join(note for keys, note in _BASE44_INTEGRATIONS if not flags.isdisjoint(keys))
+
+    lean = mode == "mvp"
 
-    return f"""Define the **complete entity model** for a Base44 app.
+    return _BASE44_MASTER_TEMPLATE.substitute(
+        idea=idea,
+        target_users_line=f"**Target Users:** {target_users}" if target_users else "",
+        entities=entities,
+        pages=pages,
+        workflows=workflows,
+        integrations_section=f"## Integrations{integrations}" if integrations else "",
+        scope_line=(
+            "- MVP: only include essential entities and pages" if lean
+            else "- Include all entities, pages, and workflows for a complete app"
+        ),
+    )
+
+
+_BASE44_ENTITIES_TEMPLATE = string.Template("""Define the **complete entity model** for a Base44 app.
 
 ## App Idea
-{idea}
-{entities}
+${idea}
+${entities}
 
 ## For Each Entity, Provide:
 
@@ -519,21 +603,26 @@ def _base44_entities(
 - **Relation**: link to another entity
 - **Select**: single choice from predefined options
 - **MultiSelect**: multiple choices
-- **JSON**: structured data"""
+- **JSON**: structured data""")
 
 
-def _base44_pages(
-    idea: str, domain: Optional[Dict],
+def _base44_entities(
+    idea: str, flags: Set[str], domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
 
-    return f"""Define the **complete page layout** for a Base44 app.
+    return _BASE44_ENTITIES_TEMPLATE.substitute(idea=idea, entities=entities)
+
+
+_BASE44_PAGES_TEMPLATE = string.Template("""Define the **complete page layout** for a Base44 app.
 
 ## App Idea
-{idea}
-{pages}
-{workflows}
+${idea}
+${pages}
+${workflows}
 
 ## For Each Page, Provide:
 
@@ -556,17 +645,30 @@ def _base44_pages(
 For dashboard/analytics pages:
 - Define stat cards (label, value source, icon)
 - Define charts (type: bar/line/pie, data source, x-axis, y-axis)
-- Define date range filter"""
+- Define date range filter""")
+
+
+def _base44_pages(
+    idea: str, domain: Optional[Dict],
+    blocks: Optional[_DomainBlocks] = None,
+) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    pages = blocks.pages
+    workflows = blocks.workflows
+
+    return _BASE44_PAGES_TEMPLATE.substitute(idea=idea, pages=pages, workflows=workflows)
 
 
 def build_base44_prompts(
     idea: str, flags: Set[str], stack: StackChoice,
     target_users: Optional[str], domain: Optional[Dict], mode: str,
 ) -> Dict[str, str]:
+    blocks = _render_domain_blocks(domain)
     prompts: Dict[str, str] = {}
-    prompts["master_prompt"] = _base44_master(idea, target_users, flags, stack, domain, mode)
-    prompts["entity_design"] = _base44_entities(idea, flags, domain)
-    prompts["page_design"] = _base44_pages(idea, domain)
+    prompts["master_prompt"] = _base44_master(idea, target_users, flags, stack, domain, mode, blocks)
+    prompts["entity_design"] = _base44_entities(idea, flags, domain, blocks)
+    prompts["page_design"] = _base44_pages(idea, domain, blocks)
     return prompts
 
 
@@ -574,38 +676,24 @@ def build_base44_prompts(
 # CLAUDE CODE — FastAPI + Next.js (detailed code generation)
 # ===================================================================
 
-def _claude_code_master(
-    idea: str, target_users: Optional[str], flags: Set[str],
-    stack: StackChoice, industry: Optional[str],
-    domain: Optional[Dict], mode: str,
-) -> str:
-    entities = _domain_entities_block(domain)
-    endpoints = _domain_endpoints_block(domain)
-    pages = _domain_pages_block(domain)
-    workflows = _domain_workflows_block(domain)
-
-    feature_sections = ""
-    if "realtime" in flags:
-        feature_sections += """
+_CLAUDE_CODE_FEATURE_SECTIONS: Dict[str, str] = {
+    "realtime": """
 ### Real-Time Features
 - WebSocket endpoint at `/ws?token=<jwt>` with connection manager and Redis pub/sub
 - Frontend `useWebSocket` hook with auto-reconnect
-"""
-    if "payments" in flags:
-        feature_sections += """
+""",
+    "payments": """
 ### Stripe Integration
 - Checkout sessions, webhook handler, billing portal, subscription management
-"""
-    if "ai" in flags:
-        feature_sections += """
+""",
+    "ai": """
 ### AI Integration
 - LLM service with streaming, prompt manager, SSE endpoint
-"""
+""",
+}
 
-    lean = mode == "mvp"
-    scope = "MVP" if lean else "COMPLETE, PRODUCTION-READY"
 
-    return f"""You are using **Claude Code** (Anthropic's CLI tool) to build a {scope} application.
+_CLAUDE_CODE_MASTER_TEMPLATE = string.Template("""You are using **Claude Code** (Anthropic's CLI tool) to build a ${scope} application.
 Generate every file needed. Use the Write tool to create each file, then run the project to verify.
 
 ## Workflow Instructions for Claude Code
@@ -619,16 +707,16 @@ Generate every file needed. Use the Write tool to create each file, then run the
 8. Commit with git after each major phase
 
 ## Project Description
-{idea}
-{f"**Target Users:** {target_users}" if target_users else ""}
-{f"**Industry:** {industry}" if industry else ""}
+${idea}
+${target_users_line}
+${industry_line}
 
 ## Tech Stack
-{_stack_block(stack)}
-{entities}
-{endpoints}
-{pages}
-{workflows}
+${stack_block}
+${entities}
+${endpoints}
+${pages}
+${workflows}
 
 ## Backend (FastAPI + Python)
 - Use SQLAlchemy 2.0 async with `mapped_column`
@@ -643,7 +731,7 @@ Generate every file needed. Use the Write tool to create each file, then run the
 - Central API client with auth header injection
 - Loading states, error states, empty states
 - Responsive design with Tailwind
-{f"## Feature Integrations{feature_sections}" if feature_sections else ""}
+${feature_section}
 
 ## Deployment
 - `backend/Dockerfile` + `frontend/Dockerfile` (multi-stage)
@@ -654,13 +742,52 @@ Generate every file needed. Use the Write tool to create each file, then run the
 - All code COMPLETE — no TODOs or placeholders
 - Full error handling, input validation, logging
 - Type hints throughout (Python + TypeScript)
-{"- MVP: skip tests, CI/CD, advanced monitoring" if lean else "- Include pytest tests, Jest tests, Playwright E2E"}"""
+${scope_line}""")
+
+
+def _claude_code_master(
+    idea: str, target_users: Optional[str], flags: Set[str],
+    stack: StackChoice, industry: Optional[str],
+    domain: Optional[Dict], mode: str,
+    blocks: Optional[_DomainBlocks] = None,
+) -> str:
+    if blocks is None:
+        blocks = _render_domain_blocks(domain)
+    entities = blocks.entities
+    endpoints = blocks.endpoints
+    pages = blocks.pages
+    workflows = blocks.workflows
+
+    feature_sections = "".join(
+        section for flag, section in _CLAUDE_CODE_FEATURE_SECTIONS.items() if flag in flags
+    )
+
+    lean = mode == "mvp"
+    scope = "MVP" if lean else "COMPLETE, PRODUCTION-READY"
+
+    return _CLAUDE_CODE_MASTER_TEMPLATE.substitute(
+        scope=scope,
+        idea=idea,
+        target_users_line=f"**Target Users:** {target_users}" if target_users else "",
+        industry_line=f"**Industry:** {industry}" if industry else "",
+        stack_block=_stack_block(stack),
+        entities=entities,
+        endpoints=endpoints,
+        pages=pages,
+        workflows=workflows,
+        feature_section=f"## Feature Integrations{feature_sections}" if feature_sections else "",
+        scope_line=(
+            "- MVP: skip tests, CI/CD, advanced monitoring" if lean
+            else "- Include pytest tests, Jest tests, Playwright E2E"
+        ),
+    )
 
 
 def build_claude_code_prompts(
     idea: str, flags: Set[str], stack: StackChoice,
     target_users: Optional[str], constraints: Optional[List[str]],
     industry: Optional[str], domain: Optional[Dict], mode: str,
+    blocks: Optional[_DomainBlocks] = None,
 ) -> str:
     """Return the Claude Code master prompt only — individual prompts use the default builders."""
-    return _claude_code_master(idea, target_users, flags, stack, industry, domain, mode)
+    return _claude_code_master(idea, target_users, flags, stack, industry, domain, mode, blocks)
@@ -15,29 +15,39 @@ _TIER_CACHE_TTL = 3600
 def get_monthly_usage(user_id: str) -> int:
     """Count generations in the current calendar month."""
     sb = get_supabase()
-    now = datetime.now(timezone.utc)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    yyyymm = datetime.now(timezone.utc).strftime("%Y%m")
 
+    # usage_counters is maintained by a trigger on usage_logs (migrations/003)
     result = (
-        sb.table("usage_logs")
-        .select("id", count="exact")
+        sb.table("usage_counters")
+        .select("count")
         .eq("user_id", user_id)
-        .eq("action", "generation")
-        .gte("created_at", month_start.isoformat())
+        .eq("yyyymm", yyyymm)
+        .maybe_single()
         .execute()
     )
-    return result.count or 0
+    # maybe_single() may return None instead of an empty response when no row exists
+    if not result or not result.data:
+        return 0
+    return result.data["count"]
 
 
-def get_tier_limit(tier: str) -> int:
-    """Fetch the monthly generation limit for a tier (cached for 1 hour)."""
-    now = time.monotonic()
+def _cached_tier_limit(tier: str) -> Optional[int]:
     cached = _tier_cache.get(tier)
     if cached:
         value, ts = cached
-        if now - ts < _TIER_CACHE_TTL:
+        if time.monotonic() - ts < _TIER_CACHE_TTL:
             return value
+    return None
+
+
+def get_tier_limit(tier: str) -> int:
+    """Fetch the monthly generation limit for a tier (cached for 1 hour)."""
+    cached = _cached_tier_limit(tier)
+    if cached is not None:
+        return cached
 
+    now = time.monotonic()
     sb = get_supabase()
     result = (
         sb.table("tier_limits")
@@ -53,11 +63,16 @@ def get_tier_limit(tier: str) -> int:
 
 def check_usage_allowed(user_id: str, tier: str) -> bool:
     """Return True if the user can generate, False if rate-limited."""
-    limit = get_tier_limit(tier)
-    if limit == -1:
+    if _cached_tier_limit(tier) == -1:
         return True
-    used = get_monthly_usage(user_id)
-    return used < limit
+
+    # One RPC (migrations/002_check_usage.sql) instead of limit + count queries
+    sb = get_supabase()
+    result = sb.rpc("check_usage", {"p_user_id": user_id, "p_tier": tier}).execute()
+    data = result.data or {}
+    limit = data.get("limit", 5)
+    _tier_cache[tier] = (limit, time.monotonic())
+    return limit == -1 or data.get("used", 0) < limit
 
 
 def log_usage(user_id: str, idea_summary: str, mode: str, tool: Optional[str]):
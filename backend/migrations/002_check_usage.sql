@@ -0,0 +1,37 @@
+-- ============================================
+-- IdeaForge: Usage check RPC
+-- Run this in the Supabase SQL Editor after 001
+-- ============================================
+
+-- Tier limit + this month's generation count in one round-trip.
+-- Unknown tiers fall back to the free limit (5), matching get_tier_limit().
+CREATE OR REPLACE FUNCTION public.check_usage(p_user_id UUID, p_tier TEXT)
+RETURNS JSONB AS $$
+DECLARE
+    v_limit INTEGER;
+    v_used INTEGER := 0;
+BEGIN
+    SELECT monthly_generations INTO v_limit
+    FROM public.tier_limits
+    WHERE tier = p_tier;
+    v_limit := COALESCE(v_limit, 5);
+
+    IF v_limit <> -1 THEN
+        SELECT COUNT(*) INTO v_used
+        FROM public.usage_logs
+        WHERE user_id = p_user_id
+          AND action = 'generation'
+          AND created_at >= date_trunc('month', NOW() AT TIME ZONE 'UTC') AT TIME ZONE 'UTC';
+    END IF;
+
+    RETURN jsonb_build_object(
+        'limit', v_limit,
+        'used', v_used,
+        'allowed', v_limit = -1 OR v_used < v_limit
+    );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Backend-only: it runs as definer, so keep it away from the anon/authenticated keys.
+REVOKE EXECUTE ON FUNCTION public.check_usage(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.check_usage(UUID, TEXT) TO service_role;
@@ -0,0 +1,71 @@
+-- ============================================
+-- IdeaForge: Monthly usage counters
+-- Run this in the Supabase SQL Editor after 002
+-- ============================================
+
+-- One row per user per UTC month, kept in step with usage_logs by a trigger,
+-- so usage checks are a primary-key lookup instead of a count over the logs.
+CREATE TABLE public.usage_counters (
+    user_id UUID NOT NULL REFERENCES public.profiles(id) ON DELETE CASCADE,
+    yyyymm TEXT NOT NULL,
+    count INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (user_id, yyyymm)
+);
+
+CREATE OR REPLACE FUNCTION public.increment_usage_counter()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.action = 'generation' THEN
+        INSERT INTO public.usage_counters (user_id, yyyymm, count)
+        VALUES (NEW.user_id, to_char(NEW.created_at AT TIME ZONE 'UTC', 'YYYYMM'), 1)
+        ON CONFLICT (user_id, yyyymm)
+        DO UPDATE SET count = public.usage_counters.count + 1;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public;
+
+CREATE TRIGGER usage_logs_increment_counter
+    AFTER INSERT ON public.usage_logs
+    FOR EACH ROW EXECUTE FUNCTION public.increment_usage_counter();
+
+-- Backfill from existing logs
+INSERT INTO public.usage_counters (user_id, yyyymm, count)
+SELECT user_id, to_char(created_at AT TIME ZONE 'UTC', 'YYYYMM'), COUNT(*)
+FROM public.usage_logs
+WHERE action = 'generation'
+GROUP BY 1, 2
+ON CONFLICT (user_id, yyyymm) DO UPDATE SET count = EXCLUDED.count;
+
+ALTER TABLE public.usage_counters ENABLE ROW LEVEL SECURITY;
+
+-- check_usage now reads the counter instead of scanning usage_logs
+CREATE OR REPLACE FUNCTION public.check_usage(p_user_id UUID, p_tier TEXT)
+RETURNS JSONB AS $$
+DECLARE
+    v_limit INTEGER;
+    v_used INTEGER;
+BEGIN
+    SELECT monthly_generations INTO v_limit
+    FROM public.tier_limits
+    WHERE tier = p_tier;
+    v_limit := COALESCE(v_limit, 5);
+
+    SELECT count INTO v_used
+    FROM public.usage_counters
+    WHERE user_id = p_user_id
+      AND yyyymm = to_char(NOW() AT TIME ZONE 'UTC', 'YYYYMM');
+    v_used := COALESCE(v_used, 0);
+
+    RETURN jsonb_build_object(
+        'limit', v_limit,
+        'used', v_used,
+        'allowed', v_limit = -1 OR v_used < v_limit
+    );
+END;
+$$ LANGUAGE plpgsql STABLE SECURITY DEFINER SET search_path = public;
+
+-- Backend-only: it runs as definer, so keep it away from the anon/authenticated keys.
+-- CREATE OR REPLACE keeps existing grants, so restate them here as well.
+REVOKE EXECUTE ON FUNCTION public.check_usage(UUID, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION public.check_usage(UUID, TEXT) TO service_role;
@@ -0,0 +1,12 @@
+-- ============================================
+-- IdeaForge: usage_logs per-user index
+-- Run this in the Supabase SQL Editor after 003
+-- ============================================
+
+-- Serves the admin "recent usage" query (user_id = ? ORDER BY created_at DESC
+-- LIMIT 10) from the index instead of sorting every row for the user.
+-- Supersedes the single-column user_id index, which is a prefix of this one.
+CREATE INDEX IF NOT EXISTS idx_usage_logs_user_created_at
+    ON public.usage_logs (user_id, created_at DESC);
+
+DROP INDEX IF EXISTS public.idx_usage_logs_user_id;
@@ -29,6 +29,8 @@ USERS = [
 def seed():
     sb = create_client(settings.supabase_url, settings.supabase_service_role_key)
 
+    # Auth users must be created one at a time; profiles are updated in one batch.
+    profiles = []
     for u in USERS:
         try:
             result = sb.auth.admin.create_user(
@@ -42,20 +44,25 @@ def seed():
 
             user_id = result.user.id
             print(f"Created user: {user_id} ({u['email']})")
-
-            sb.table("profiles").update(
+            profiles.append(
                 {
+                    "id": user_id,
+                    "email": u["email"],
                     "role": u["role"],
                     "tier": u["tier"],
                     "full_name": u["name"],
                 }
-            ).eq("id", user_id).execute()
-
-            print(f"  -> role={u['role']}, tier={u['tier']}")
+            )
 
         except Exception as e:
             print(f"Skipping {u['email']}: {e}")
 
+    if profiles:
+        # Rows already exist (created by the on_auth_user_created trigger)
+        sb.table("profiles").upsert(profiles, on_conflict="id").execute()
+        for p in profiles:
+            print(f"  -> {p['email']}: role={p['role']}, tier={p['tier']}")
+
     print("\n--- Seed accounts ---")
     for u in USERS:
         print(f"  {u['role'].upper():>10}  {u['email']}  /  {u['password']}  (tier: {u['tier']})")